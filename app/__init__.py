@@ -1,3 +1,7 @@
+import logging
+import os
+
+import click
 from flask import Flask
 
 # router
@@ -20,6 +24,11 @@ from dotenv import load_dotenv
 from config import InitConfig
 from app.models import models
 from utils.error_handlers import register_error_handlers
+from utils.text_classification import init_classifier
+from app.commands import incidents_cli, classifier_cli, storage_cli
+
+# Logging aplikasi; level diatur lewat LOG_LEVEL (default: INFO)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Create Flask app instance
 app = Flask(__name__)
@@ -54,4 +63,16 @@ with app.app_context():
     app.register_blueprint(incident_institution_route, url_prefix='/incidents/institutions')
     app.register_blueprint(incident_vehicle_route, url_prefix='/incidents/vehicles')
     app.register_blueprint(storage_route, url_prefix='/storage')
+
+    # Register CLI commands
+    app.cli.add_command(incidents_cli)
+    app.cli.add_command(classifier_cli)
+    app.cli.add_command(storage_cli)
+
+    # Muat model klasifikasi sesuai CLASSIFIER_LOAD_MODE (default: background).
+    # Perintah CLI selain `flask run` (db, storage, classifier ...) dilewati;
+    # `flask incidents reclassify` memuat model sendiri saat dibutuhkan.
+    cli_context = click.get_current_context(silent=True)
+    if cli_context is None or cli_context.info_name == 'run':
+        init_classifier()
     
\ No newline at end of file
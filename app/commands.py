@@ -0,0 +1,249 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+import numpy as np
+from flask.cli import AppGroup
+
+from app.extensions import db
+from app.models.models import Incident, LabelStatus, User, Vehicle
+from utils.images import thumbnail_path
+from utils.model_registry import get_registry
+from utils.lite_backend import export_lite_model
+from utils.storage import get_storage
+from utils.text_classification import BUNDLED_MODEL_DIR, MAX_SEQUENCE_LENGTH, get_classifier
+
+incidents_cli = AppGroup('incidents', help='Perintah pemeliharaan data incident.')
+classifier_cli = AppGroup('classifier', help='Perintah pengelolaan versi model klasifikasi.')
+storage_cli = AppGroup('storage', help='Perintah pemeliharaan file di storage.')
+
+# Direktori storage yang isinya dirujuk oleh kolom gambar di database
+STORAGE_DIRS = ('incidents', 'vehicles', 'avatars')
+
+def _read_checkpoint(path):
+    if not os.path.exists(path):
+        return {'last_id': 0, 'processed': 0}
+    with open(path) as handle:
+        return json.load(handle)
+
+def _write_checkpoint(path, checkpoint):
+    # Tulis ke file sementara lalu rename agar checkpoint tidak pernah setengah jadi
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump(checkpoint, handle)
+    os.replace(tmp_path, path)
+
+# Klasifikasi ulang seluruh incident
+@incidents_cli.command('reclassify')
+@click.option('--chunk-size', default=2000, show_default=True, help='Jumlah baris per halaman kueri.')
+@click.option('--batch-size', default=256, show_default=True, help='Jumlah deskripsi per forward pass model.')
+@click.option('--checkpoint', 'checkpoint_path', default='.reclassify_checkpoint.json', show_default=True,
+              help='File checkpoint untuk melanjutkan proses yang terhenti.')
+@click.option('--restart', is_flag=True, help='Abaikan checkpoint dan mulai dari awal.')
+@click.option('--only-pending', is_flag=True, help='Hanya incident dengan label_status pending/failed.')
+def reclassify(chunk_size, batch_size, checkpoint_path, restart, only_pending):
+    """Label ulang incident dengan model klasifikasi saat ini."""
+    checkpoint = {'last_id': 0, 'processed': 0} if restart else _read_checkpoint(checkpoint_path)
+    if checkpoint['last_id']:
+        click.echo(f"Melanjutkan dari incident id > {checkpoint['last_id']} ({checkpoint['processed']} baris sudah diproses).")
+
+    classifier = get_classifier()
+    started = time.perf_counter()
+    processed = 0
+
+    while True:
+        # Keyset pagination: tidak memakai OFFSET sehingga tiap halaman tetap murah
+        query = db.session.query(Incident.id, Incident.description) \
+            .filter(Incident.id > checkpoint['last_id'])
+        if only_pending:
+            query = query.filter(Incident.label_status.in_([LabelStatus.PENDING, LabelStatus.FAILED]))
+        rows = query.order_by(Incident.id).limit(chunk_size).all()
+
+        if not rows:
+            break
+
+        # Deskripsi kosong tidak bisa diklasifikasi, lewati
+        rows_to_classify = [row for row in rows if row.description and row.description.strip()]
+
+        updates = []
+        for start in range(0, len(rows_to_classify), batch_size):
+            batch = rows_to_classify[start:start + batch_size]
+            labels = classifier.predict_batch([row.description for row in batch])
+            updates.extend(
+                {
+                    'id': row.id,
+                    'label': str(label),
+                    'label_status': LabelStatus.CLASSIFIED,
+                    'model_version': classifier.version,
+                }
+                for row, label in zip(batch, labels)
+            )
+
+        try:
+            # Satu executemany UPDATE per halaman
+            db.session.bulk_update_mappings(Incident, updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        processed += len(updates)
+        checkpoint['last_id'] = rows[-1].id
+        checkpoint['processed'] += len(updates)
+        _write_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.perf_counter() - started
+        click.echo(f"id <= {checkpoint['last_id']}: {processed} baris, {processed / elapsed:.1f} baris/detik")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - started
+    click.echo(f"Selesai: {processed} baris dalam {elapsed:.1f} detik ({processed / max(elapsed, 1e-9):.1f} baris/detik).")
+# Akhir Klasifikasi ulang seluruh incident
+
+# Daftar versi model
+@classifier_cli.command('versions')
+def versions():
+    """Tampilkan versi model yang tersedia di CLASSIFIER_MODELS_DIR."""
+    registry = get_registry()
+    if registry is None:
+        raise click.ClickException('CLASSIFIER_MODELS_DIR belum diatur.')
+
+    active = registry.active_version()
+    for version in registry.versions():
+        marker = '*' if version == active else ' '
+        click.echo(f"{marker} {version}")
+# Akhir Daftar versi model
+
+# Aktifkan versi model
+@classifier_cli.command('activate')
+@click.argument('version')
+def activate(version):
+    """Aktifkan VERSION; tiap worker memuat dan menukar model di background."""
+    registry = get_registry()
+    if registry is None:
+        raise click.ClickException('CLASSIFIER_MODELS_DIR belum diatur.')
+
+    try:
+        registry.activate(version)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Versi {version} diaktifkan.")
+# Akhir Aktifkan versi model
+
+# Ekspor model untuk backend lite
+@classifier_cli.command('export-lite')
+@click.option('--version', default=None, help='Versi di CLASSIFIER_MODELS_DIR; default model bawaan.')
+@click.option('--quantize', is_flag=True, help='Simpan bobot sebagai int8 (dynamic range quantization).')
+def export_lite(version, quantize):
+    """Ekspor model ke .tflite + vocabulary.json untuk CLASSIFIER_BACKEND=tflite."""
+    model_dir = BUNDLED_MODEL_DIR
+    if version is not None:
+        registry = get_registry()
+        if registry is None or version not in registry.versions():
+            raise click.ClickException(f'Versi model tidak ditemukan: {version}')
+        model_dir = registry.path_for(version)
+
+    lite_path = export_lite_model(model_dir, MAX_SEQUENCE_LENGTH, quantize=quantize)
+    click.echo(f"Model lite disimpan di {lite_path} ({os.path.getsize(lite_path) / 1024:.1f} KB).")
+# Akhir Ekspor model untuk backend lite
+
+def _log_likelihood(classifier, probabilities, targets, temperature):
+    scaled = classifier._calibrate(probabilities, temperature)
+    return float(np.log(np.clip(scaled[np.arange(len(targets)), targets], 1e-12, None)).mean())
+
+# Kalibrasi temperature classifier
+@classifier_cli.command('calibrate')
+@click.argument('labeled_csv', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=256, show_default=True, help='Jumlah deskripsi per forward pass model.')
+def calibrate(labeled_csv, batch_size):
+    """Cari CLASSIFIER_TEMPERATURE dari incident berlabel (CSV dengan kolom description dan label)."""
+    classifier = get_classifier()
+    with open(labeled_csv, newline='') as handle:
+        rows = [row for row in csv.DictReader(handle) if (row.get('description') or '').strip()]
+    if not rows:
+        raise click.ClickException('CSV tidak berisi baris dengan kolom description dan label.')
+
+    # Probabilitas mentah (T = 1); skala temperature diterapkan saat pencarian
+    probabilities = np.vstack([
+        classifier.predict_proba([row['description'] for row in rows[start:start + batch_size]], temperature=1.0)
+        for start in range(0, len(rows), batch_size)
+    ])
+
+    # Urutan kelas dari label encoder (Keras) maupun vocabulary.json (lite)
+    classes = [str(label) for label in classifier.label_encoder.inverse_transform(np.arange(probabilities.shape[1]))]
+    unknown = {row['label'] for row in rows} - set(classes)
+    if unknown:
+        raise click.ClickException(f"Label tidak dikenal model: {', '.join(sorted(unknown))}")
+    targets = np.array([classes.index(row['label']) for row in rows])
+
+    # Golden-section search atas log T untuk log-likelihood maksimum
+    low, high = np.log(0.05), np.log(20.0)
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(60):
+        left, right = high - ratio * (high - low), low + ratio * (high - low)
+        if _log_likelihood(classifier, probabilities, targets, np.exp(left)) > \
+                _log_likelihood(classifier, probabilities, targets, np.exp(right)):
+            high = right
+        else:
+            low = left
+    temperature = float(np.exp((low + high) / 2))
+
+    accuracy = float((probabilities.argmax(axis=1) == targets).mean())
+    before = -_log_likelihood(classifier, probabilities, targets, 1.0)
+    after = -_log_likelihood(classifier, probabilities, targets, temperature)
+    click.echo(f"{len(rows)} incident berlabel, akurasi {accuracy:.3f}.")
+    click.echo(f"NLL {before:.4f} (T=1) -> {after:.4f} (T={temperature:.3f})")
+    click.echo(f"Set CLASSIFIER_TEMPERATURE={temperature:.3f}")
+# Akhir Kalibrasi temperature classifier
+
+# Hapus gambar yatim
+@storage_cli.command('gc')
+@click.option('--grace-hours', default=24.0, show_default=True,
+              help='Objek yang lebih baru dari ini dilewati (upload yang belum tersimpan di database).')
+@click.option('--batch-size', default=100, show_default=True, help='Jumlah objek per batch request hapus (maks. 100 untuk GCS).')
+@click.option('--dry-run', is_flag=True, help='Hanya tampilkan objek yang akan dihapus.')
+def collect_garbage(grace_hours, batch_size, dry_run):
+    """Hapus gambar yang tidak dirujuk vehicles.picture, incidents.picture maupun users.avatar."""
+    # Jumlah baris yang merujuk tiap path; thumbnail ikut dianggap dipakai
+    references = {}
+    for column in (Vehicle.picture, Incident.picture, User.avatar):
+        for path, count in db.session.query(column, db.func.count()).filter(column.isnot(None)).group_by(column):
+            references[path] = references.get(path, 0) + count
+    referenced = set(references) | {thumbnail_path(path) for path in references}
+
+    storage = get_storage()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    scanned = 0
+    repaired = 0
+    orphans = []
+    for dir in STORAGE_DIRS:
+        for obj in storage.listFiles(f'{dir}/'):
+            scanned += 1
+            if obj.name in references:
+                # Jumlah referensi di storage yang lebih kecil dari database
+                # akan menghapus gambar yang masih dipakai; naikkan. Yang lebih
+                # besar cukup dibiarkan: objek dihapus di sini saat tak dirujuk lagi
+                if not dry_run and storage.ensureReferences(obj, references[obj.name]):
+                    repaired += 1
+            elif obj.name not in referenced and obj.updated and obj.updated < cutoff:
+                orphans.append(obj)
+
+    click.echo(f"{len(orphans)} dari {scanned} objek tidak dirujuk database.")
+    if dry_run:
+        for obj in orphans:
+            click.echo(obj.name)
+        return
+    if repaired:
+        click.echo(f"Jumlah referensi {repaired} objek diperbaiki.")
+
+    deleted = 0
+    started = time.perf_counter()
+    for start in range(0, len(orphans), batch_size):
+        deleted += storage.deleteFiles(orphans[start:start + batch_size])
+    click.echo(f"{deleted} objek dihapus dalam {time.perf_counter() - started:.1f} detik.")
+# Akhir Hapus gambar yatim
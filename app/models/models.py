@@ -10,6 +10,16 @@ class Label(str, Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+class LabelStatus(str, Enum):
+    PENDING = 'pending'
+    CLASSIFIED = 'classified'
+    FAILED = 'failed'
+
+class PictureStatus(str, Enum):
+    PENDING = 'pending'
+    UPLOADED = 'uploaded'
+    FAILED = 'failed'
+
 class IncidentStatus(str, Enum):
     REPORTED = 'reported'
     HANDLED = 'handled'
@@ -147,10 +157,13 @@ class Incident(db.Model):
     institution_id = db.Column(db.BigInteger, db.ForeignKey('institutions.id'), nullable=False)
     description = db.Column(db.Text)
     label = db.Column(db.Enum(Label), nullable=False)
+    label_status = db.Column(db.Enum(LabelStatus), nullable=False, default=LabelStatus.CLASSIFIED, server_default=LabelStatus.CLASSIFIED.name)
+    model_version = db.Column(db.String(50), nullable=True)
     status = db.Column(db.Enum(IncidentStatus), nullable=False, default=IncidentStatus.REPORTED)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
     picture = db.Column(db.String(255), nullable=True)
+    picture_status = db.Column(db.Enum(PictureStatus), nullable=False, default=PictureStatus.UPLOADED, server_default=PictureStatus.UPLOADED.name)
     completed_at = db.Column(db.TIMESTAMP)
     reported_at = db.Column(db.TIMESTAMP)
     handle_at = db.Column(db.TIMESTAMP)
@@ -1,4 +1,6 @@
-from flask import jsonify, Blueprint
+from flask import jsonify, Blueprint, Response, abort
+from utils.metrics import METRICS_ENABLED, render_metrics
+from utils.text_classification import classifier_status
 
 home_route = Blueprint('home', __name__)
 @home_route.route('/', methods=['GET'])
@@ -6,4 +8,27 @@ def home() :
   return jsonify(
     status=True,
     message="Welcome to InstHelp backend service!"
-  )
\ No newline at end of file
+  )
+
+@home_route.route('/ready', methods=['GET'])
+def ready() :
+  classifier = classifier_status()
+  if classifier == 'ready' :
+    return jsonify(
+      status=True,
+      message="Service is ready.",
+      data={ "classifier": classifier }
+    ), 200
+  return jsonify(
+    status=False,
+    message="Classifier is not ready yet.",
+    data={ "classifier": classifier }
+  ), 503
+
+
+@home_route.route('/metrics', methods=['GET'])
+def metrics() :
+  # Histogram per tahap klasifikasi; hanya tersedia jika CLASSIFIER_METRICS=true
+  if not METRICS_ENABLED :
+    abort(404)
+  return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
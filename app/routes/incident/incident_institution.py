@@ -4,6 +4,7 @@ from marshmallow import ValidationError
 from flask import Blueprint, request, jsonify
 from utils.datetime import get_current_time_in_timezone
 from utils import auth
+from utils.images import thumbnail_path
 from app.models.models import Incident, IncidentStatus, Institution, IncidentVehicle, IncidentVehicleStatus, Vehicle
 
 from app.schemas.incident.handle_schema import HandleIncidentSchema
@@ -41,6 +42,7 @@ def get_incident_institution():
             "description": incident.description,
             "reported_at": incident.reported_at.strftime('%H:%M'),  # Format jam dan menit
             "picture": incident.picture,
+            "thumbnail": thumbnail_path(incident.picture),
             "status": incident.status,
         }
         for incident in incidents
@@ -3,6 +3,7 @@ from app.extensions import db
 from flask import Blueprint, request, jsonify
 
 from utils import auth
+from utils.images import thumbnail_path
 from app.models.models import Incident, IncidentStatus, Resident
 
 incident_resident_route = Blueprint('incidents/residents', __name__)
@@ -38,6 +39,7 @@ def get_incident_resident():
             "description": incident.description,
             "reported_at": incident.reported_at.strftime('%H:%M'),  # Format jam dan menit
             "picture": incident.picture,
+            "thumbnail": thumbnail_path(incident.picture),
             "status": incident.status,
         }
         for incident in incidents
@@ -81,6 +83,7 @@ def get_incident_resident_by_id(incident_id):
                 "longitude": incident.longitude
             },
             "picture": incident.picture,
+            "picture_status": incident.picture_status,
             "status": incident.status,
             "resident": {
                 "id": incident.resident.id,
@@ -110,6 +113,7 @@ def get_incident_resident_by_id(incident_id):
                 "longitude": incident.longitude
             },
             "picture": incident.picture,
+            "picture_status": incident.picture_status,
             "status": incident.status,
             "resident": {
                 "id": incident.resident.id,
@@ -139,6 +143,7 @@ def get_incident_resident_by_id(incident_id):
                 "longitude": incident.longitude
             },
             "picture": incident.picture,
+            "picture_status": incident.picture_status,
             "status": incident.status,
             "resident": {
                 "id": incident.resident.id,
@@ -168,6 +173,7 @@ def get_incident_resident_by_id(incident_id):
                 "longitude": incident.longitude
             },
             "picture": incident.picture,
+            "picture_status": incident.picture_status,
             "status": incident.status,
             "resident": {
                 "id": incident.resident.id,
@@ -195,4 +201,36 @@ def get_incident_resident_by_id(incident_id):
         message='Data berhasil dimuat.',
         data=incident_data
     ), 200
-# Akhir Ambil Data berdasarkan ID
\ No newline at end of file
+# Akhir Ambil Data berdasarkan ID
+
+# Status Klasifikasi Laporan
+@incident_resident_route.route('/<int:incident_id>/classification', methods=['GET'])
+@auth.login_required
+def get_incident_classification(incident_id):
+    # Ambil user berdasarkan data login
+    user_id = get_jwt_identity()
+    resident_id = Resident.query.filter_by(user_id = user_id).with_entities(Resident.id).scalar()
+
+    incident = db.session.query(
+        Incident.id,
+        Incident.label,
+        Incident.label_status,
+    ).filter_by(id=incident_id, resident_id=resident_id).first()
+
+    # Jika data tidak ditemukan
+    if not incident:
+        return jsonify(
+            status=False,
+            message='Laporan tidak ditemukan.',
+        ), 404
+
+    return jsonify(
+        status=True,
+        message='Status klasifikasi berhasil dimuat.',
+        data={
+            "id": incident.id,
+            "label": incident.label,
+            "label_status": incident.label_status,
+        }
+    ), 200
+# Akhir Status Klasifikasi Laporan
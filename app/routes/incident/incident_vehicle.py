@@ -4,6 +4,7 @@ from marshmallow import ValidationError
 from flask import Blueprint, request, jsonify
 from utils.datetime import get_current_time_in_timezone
 from utils import auth
+from utils.images import thumbnail_path
 from app.models.models import Incident, IncidentStatus, Vehicle, IncidentVehicle, IncidentVehicleStatus, Driver
 
 incident_vehicle_route = Blueprint('incidents/vehicles', __name__)
@@ -39,6 +40,7 @@ def get_incident_vehicle():
             "description": incident.description,
             "reported_at": incident.reported_at.strftime('%H:%M'),  # Format jam dan menit
             "picture": incident.picture,
+            "thumbnail": thumbnail_path(incident.picture),
             "status": incident.status,
         }
         for incident in incidents
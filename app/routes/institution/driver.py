@@ -8,6 +8,7 @@ from itsdangerous import URLSafeTimedSerializer
 from flask_mail import Message
 
 from utils import auth
+from utils.upload_jobs import enqueue_deletion
 from app.models.models import Driver, User, Role, UserRole
 
 # schemas
@@ -288,12 +289,17 @@ def delete_driver(driver_id):
 
         # Hapus data User
         user = User.query.get(user_id)
+        avatar = user.avatar if user else None
         if user:
             db.session.delete(user)
 
         # Commit transaksi
         db.session.commit()
 
+        # Lepas referensi avatar di background
+        if avatar:
+            enqueue_deletion(avatar)
+
         return jsonify(
             status=True,
             message='Pengemudi berhasil dihapus.'
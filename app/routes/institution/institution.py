@@ -4,9 +4,13 @@ from marshmallow import ValidationError
 from flask import Blueprint, request, jsonify
 from utils import auth
 from utils.datetime import get_current_time_in_timezone
-from app.models.models import Institution, User, Vehicle, Driver, Incident, Resident
-from utils.storage import storage_manager
-from utils.text_classification import predict_emergency_case
+from app.models.models import Institution, User, Vehicle, Driver, Incident, Resident, LabelStatus, PictureStatus
+from utils.storage import get_storage
+from utils.images import InvalidImageError
+from utils.uploads import check_image, request_data, request_image
+from utils.upload_jobs import async_upload_enabled, discard_upload, submit_upload, store_incident_picture
+from utils.text_classification import classify_emergency_case, get_fallback_label
+from utils.classification_jobs import async_classification_enabled, enqueue_classification
  
 from app.schemas.incident.create_schema import CreateIncidentSchema
 
@@ -165,13 +169,16 @@ def add_incident(institution_id):
     user_id = get_jwt_identity()
     resident_id = Resident.query.filter_by(user_id = user_id).with_entities(Resident.id).scalar()
 
+    upload = None
+    deferred_upload = False
      # Simpan data incident ke database
     try:
         schema = CreateIncidentSchema(db_session=db.session)
 
-        # Validasi permintaan data
+        # Validasi permintaan data (JSON atau multipart/form-data)
+        payload = request_data()
         try:
-            data = schema.load(request.json)
+            data = schema.load(payload)
         except ValidationError as err:
             return jsonify({
                 'status': False,
@@ -179,20 +186,65 @@ def add_incident(institution_id):
                 'errors': err.messages
             }), 400
         
-        file = request.get_json()
-        image_base64 = file.get('picture')
+        # Gambar berupa file multipart, base64 di JSON, atau path hasil upload langsung
+        image = request_image(payload, 'picture')
         
-        if not image_base64:
+        if not image and not data.get('picture_path'):
             return jsonify({
                 'status': False,
                 'message': 'Tidak ada gambar yang disediakan'
             }), 400
         
-        # Upload gambar dan dapatkan path
-        file_path = storage_manager.uploadFile(image_base64, dir='incidents')
+        if image:
+            # Tipe gambar dicek dari header dulu; upload di background tidak bisa lagi menolaknya
+            try:
+                check_image(image)
+            except InvalidImageError as e:
+                return jsonify({
+                    'status': False,
+                    'message': f'Gambar tidak valid: {e}'
+                }), 400
+
+            # Upload gambar di background, bersamaan dengan klasifikasi
+            deferred_upload = async_upload_enabled()
+            upload = submit_upload(image, dir='incidents', detach=deferred_upload)
+        else:
+            # Gambar sudah diupload lewat signed URL; cukup verifikasi ukuran dan tipenya
+            try:
+                file_path = get_storage().verifyUpload(data['picture_path'], dir='incidents', owner=user_id)
+            except ValueError as e:
+                return jsonify({
+                    'status': False,
+                    'message': str(e)
+                }), 400
+        
+        # Mode async: simpan dengan label sementara, klasifikasi di background
+        deferred = async_classification_enabled() and 'label' not in data
+        model_version = None
+        confidence = None
+        if deferred:
+            label = get_fallback_label()
+            label_status = LabelStatus.PENDING
+        elif 'label' in data:
+            # Label dari client dipakai apa adanya, tanpa memanggil model
+            label = data['label']
+            label_status = LabelStatus.CLASSIFIED
+        else:
+            classification = classify_emergency_case(data['description'])
+            label = classification.label
+            model_version = classification.model_version
+            confidence = classification.confidence
+            # Label fallback (pool penuh/tidak terjangkau) diklasifikasi ulang nanti
+            label_status = LabelStatus.PENDING if classification.fallback else LabelStatus.CLASSIFIED
         
-        predicted_label = predict_emergency_case(data['description'])
-        label = data['label'] if 'label' in data else predicted_label
+        # Mode async: gambar diisi setelah upload selesai
+        if deferred_upload:
+            file_path = None
+            picture_status = PictureStatus.PENDING
+        else:
+            if upload:
+                file_path = upload.result()
+            picture_status = PictureStatus.UPLOADED if file_path else PictureStatus.FAILED
         
         new_incident = Incident(
             institution_id=institution_id,
@@ -201,13 +253,23 @@ def add_incident(institution_id):
             latitude=data['latitude'],
             longitude=data['longitude'],
             label=label,  # Label sudah divalidasi
+            label_status=label_status,
+            model_version=model_version,
             picture=file_path,
+            picture_status=picture_status,
             reported_at=get_current_time_in_timezone('Asia/Jakarta')  # WIB
         )
         db.session.add(new_incident)
 
         # Simpan semua perubahan ke database
         db.session.commit()
+        # Gambar sudah dimiliki incident; tidak dilepas lagi jika langkah berikutnya gagal
+        picture_upload, upload = upload, None
+
+        if deferred:
+            enqueue_classification(new_incident.id, data['description'])
+        if deferred_upload:
+            store_incident_picture(new_incident.id, picture_upload)
 
         return jsonify({
             'status': True,
@@ -217,16 +279,25 @@ def add_incident(institution_id):
                 'institution_id': new_incident.institution_id,
                 'resident_id': new_incident.resident_id,
                 'label': new_incident.label,
+                'label_status': new_incident.label_status,
+                'model_version': new_incident.model_version,
+                'confidence': confidence,
                 'description': new_incident.description,
                 'latitude': new_incident.latitude,
                 'longitude': new_incident.longitude,
                 'picture': new_incident.picture,
+                'picture_status': new_incident.picture_status,
             }
         }), 201
 
     except Exception as e:
         # Rollback untuk semua jenis kesalahan
         db.session.rollback()
+
+        # Lepas gambar yang tidak jadi disimpan; upload yang masih membaca
+        # stream request ditunggu dulu agar stream tidak ditutup di tengah jalan
+        if upload is not None:
+            discard_upload(upload, wait=not deferred_upload)
         
         # Tangani ValidationError secara spesifik
         if isinstance(e, ValidationError):
@@ -235,6 +306,13 @@ def add_incident(institution_id):
                 'message': 'Kesalahan validasi',
                 'errors': e.messages
             }), 400
+
+        # Gambar ditolak saat upload (mis. terlalu banyak piksel)
+        if isinstance(e, InvalidImageError):
+            return jsonify({
+                'status': False,
+                'message': f'Gambar tidak valid: {e}'
+            }), 400
         
         # Tangani kesalahan umum
         return jsonify(
@@ -1,11 +1,15 @@
+from flask_jwt_extended import get_jwt_identity
 from app.extensions import db
 from marshmallow import ValidationError
 from flask import Blueprint, request, jsonify
 
 from utils import auth
 from utils.URL import StorageURL
+from utils.images import InvalidImageError, thumbnail_path
 from app.models.models import Vehicle, User, Vehicle, Driver
-from utils.storage import storage_manager
+from utils.storage import get_storage
+from utils.uploads import request_data, request_image, upload_image
+from utils.upload_jobs import enqueue_deletion
 
 # schemas
 from app.schemas.vehicle.create_schema import CreateVehicleSchema
@@ -48,6 +52,7 @@ def get_vehicles():
             "description": vehicle.description,
             "is_ready": vehicle.is_ready,
             "picture": StorageURL(vehicle.picture),
+            "thumbnail": StorageURL(thumbnail_path(vehicle.picture)),
             "driver": {
                 "id": vehicle.driver_id,
                 "name": vehicle.driver_name
@@ -71,9 +76,10 @@ def add_vehicles():
     try:
         schema = CreateVehicleSchema(db_session=db.session)
 
-        # Validasi permintaan data
+        # Validasi permintaan data (JSON atau multipart/form-data)
+        payload = request_data()
         try:
-            data = schema.load(request.json)
+            data = schema.load(payload)
         except ValidationError as err:
             return jsonify({
                 'status': False,
@@ -81,17 +87,33 @@ def add_vehicles():
                 'errors': err.messages
             }), 400
         
-        file = request.get_json()
-        image_base64 = file.get('picture')
+        # Gambar berupa file multipart, base64 di JSON, atau path hasil upload langsung
+        image = request_image(payload, 'picture')
         
-        if not image_base64:
+        if not image and not data.get('picture_path'):
             return jsonify({
                 'status': False,
                 'message': 'Tidak ada gambar yang disediakan'
             }), 400
         
-        # Upload gambar dan dapatkan path
-        file_path = storage_manager.uploadFile(image_base64, dir='vehicles')
+        if image:
+            # Upload gambar dan dapatkan path; tipe yang tidak diizinkan ditolak
+            try:
+                file_path = upload_image(image, dir='vehicles')
+            except InvalidImageError as e:
+                return jsonify({
+                    'status': False,
+                    'message': f'Gambar tidak valid: {e}'
+                }), 400
+        else:
+            # Gambar sudah diupload lewat signed URL; cukup verifikasi ukuran dan tipenya
+            try:
+                file_path = get_storage().verifyUpload(data['picture_path'], dir='vehicles', owner=get_jwt_identity())
+            except ValueError as e:
+                return jsonify({
+                    'status': False,
+                    'message': str(e)
+                }), 400
         
         new_vehicles = Vehicle(
             institution_id=data['institution_id'],
@@ -219,11 +241,16 @@ def delete_driver(vehicle_id):
             }), 404
 
         # Hapus data Vehicle
+        picture = vehicle.picture
         db.session.delete(vehicle)
 
         # Commit transaksi
         db.session.commit()
 
+        # Lepas referensi gambar di background; blob hanya dihapus jika tidak dipakai lagi
+        if picture:
+            enqueue_deletion(picture)
+
         return jsonify(
             status= True,
             message='Kendaraan berhasil dihapus.'
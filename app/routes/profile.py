@@ -4,6 +4,10 @@ from app.extensions import db
 from marshmallow import ValidationError
 
 from utils import auth
+from utils.images import InvalidImageError
+from utils.storage import get_storage
+from utils.uploads import request_data, request_image, upload_image
+from utils.upload_jobs import enqueue_deletion
 from app.models.models import User
 
 from app.schemas.profile_schema import ResidentProfileSchema, DriverProfileSchema, InstitutionProfileSchema, AdministrationProfileSchema
@@ -98,6 +102,9 @@ def update_profile():
     # Get user's role
     user_role = user.roles[0].name if user.roles else None
     
+    # Data dari JSON atau multipart/form-data (avatar sebagai file)
+    payload = request_data()
+    
     try:
         # Pilih skema yang sesuai berdasarkan peran pengguna
         if user_role == 'resident':
@@ -105,7 +112,7 @@ def update_profile():
             schema = ResidentProfileSchema(db_session=db.session, user_id=user_id)
 
             try:
-                data = schema.load(request.json)
+                data = schema.load(payload)
             except ValidationError as err:
                 return jsonify({
                     'status': False,
@@ -126,6 +133,7 @@ def update_profile():
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
             user.address = data.get('address', user.address)
+            previous_avatar = update_avatar(user, payload)
 
             # Ubah data Masyarakat
             resident.nik = data.get('nik', resident.nik)
@@ -136,6 +144,10 @@ def update_profile():
             
             db.session.commit()
 
+            # Avatar lama baru dilepas setelah perubahan tersimpan
+            if previous_avatar:
+                enqueue_deletion(previous_avatar)
+
             return jsonify({
                 'status': True,
                 'message': 'Profil berhasil diperbarui',
@@ -155,7 +167,7 @@ def update_profile():
             # Validasi permintaan data
             schema = DriverProfileSchema(db_session=db.session, user_id=user_id)
             try:
-                data = schema.load(request.json)
+                data = schema.load(payload)
             except ValidationError as err:
                 return jsonify({
                     'status': False,
@@ -175,6 +187,7 @@ def update_profile():
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
             user.address = data.get('address', user.address)
+            previous_avatar = update_avatar(user, payload)
 
             # Ubah data Pengemudi
             driver.phone_number = data.get('phone_number', driver.phone_number)
@@ -182,6 +195,10 @@ def update_profile():
             
             db.session.commit()
 
+            # Avatar lama baru dilepas setelah perubahan tersimpan
+            if previous_avatar:
+                enqueue_deletion(previous_avatar)
+
             return jsonify({
                 'status': True,
                 'message': 'Profil berhasil diperbarui',
@@ -199,7 +216,7 @@ def update_profile():
             schema = InstitutionProfileSchema(db_session=db.session, user_id=user_id)
             
             try:
-                data = schema.load(request.json)
+                data = schema.load(payload)
             except ValidationError as err:
                 return jsonify({
                     'status': False,
@@ -219,6 +236,7 @@ def update_profile():
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
             user.address = data.get('address', user.address)
+            previous_avatar = update_avatar(user, payload)
             
             # Ubah data Instansi
             institution.description = data.get('description', institution.description)
@@ -226,6 +244,11 @@ def update_profile():
             institution.longitude = data.get('longitude', institution.longitude)
             
             db.session.commit()
+
+            # Avatar lama baru dilepas setelah perubahan tersimpan
+            if previous_avatar:
+                enqueue_deletion(previous_avatar)
+
             return jsonify({
                 'status': True,
                 'message': 'Profil berhasil diperbarui',
@@ -244,7 +267,7 @@ def update_profile():
         elif user_role == 'administration':
             schema = AdministrationProfileSchema(db_session=db.session, user_id=user_id)
             try:
-                data = schema.load(request.json)
+                data = schema.load(payload)
             except ValidationError as err:
                 return jsonify({
                     'status': False,
@@ -252,13 +275,18 @@ def update_profile():
                     'errors': err.messages
                 }), 400
 
-            db.session.commit()
-
             # Ubah user data
             user.name = data.get('name', user.name)
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
             user.address = data.get('address', user.address)
+            previous_avatar = update_avatar(user, payload)
+
+            db.session.commit()
+
+            # Avatar lama baru dilepas setelah perubahan tersimpan
+            if previous_avatar:
+                enqueue_deletion(previous_avatar)
 
             return jsonify({
                 'status': True,
@@ -286,3 +314,33 @@ def update_profile():
             status=False,
             message= f'Terjadi kesalahan: {str(e)}'
         ), 500
+
+# Ganti avatar user; mengembalikan path avatar lama yang dilepas pemanggil
+# dengan enqueue_deletion setelah commit berhasil
+def update_avatar(user, payload):
+    # Upload avatar baru jika dikirim; gagal upload tetap memakai avatar lama
+    avatar = request_image(payload, 'avatar')
+    if avatar:
+        # Tipe gambar yang tidak diizinkan dianggap kesalahan validasi
+        try:
+            file_path = upload_image(avatar, dir='avatars')
+        except InvalidImageError as e:
+            raise ValidationError({'avatar': [f'Gambar tidak valid: {e}']})
+    elif payload.get('avatar_path'):
+        # Path yang sama dengan avatar sekarang tidak mengubah apa pun
+        if payload['avatar_path'] == user.avatar:
+            return None
+        # Avatar sudah diupload lewat signed URL; path tidak valid dianggap kesalahan validasi
+        try:
+            file_path = get_storage().verifyUpload(payload['avatar_path'], dir='avatars', owner=user.id)
+        except ValueError as e:
+            raise ValidationError({'avatar_path': [str(e)]})
+    else:
+        return None
+
+    if not file_path:
+        return None
+    # Referensi avatar lama dilepas pemanggil; blob hanya dihapus jika tidak dipakai lagi
+    previous = user.avatar
+    user.avatar = file_path
+    return previous
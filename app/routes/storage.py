@@ -1,19 +1,104 @@
-import io
+import os
+from datetime import datetime, timezone
 
-from flask import Blueprint, send_file, jsonify
-from utils import storage
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import FileWrapper
+from utils import auth
+from utils.images import is_content_addressed
+from utils.storage import get_storage
+from utils.storage_cache import cache_key, get_storage_cache
 
 storage_route = Blueprint('storage', __name__)
 
+# Objek bernama hash tidak pernah berubah dan boleh di-cache klien selamanya;
+# nama lain (upload lama dan upload langsung) di-cache sebentar saja
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MUTABLE_MAX_AGE = int(os.getenv('STORAGE_PROXY_MAX_AGE', 300))
+
+# Ukuran buffer saat menulis response ke klien
+STREAM_BUFFER_SIZE = 64 * 1024
+
 @storage_route.route('/<path:filepath>', methods=['GET'])
 def view(filepath) :
-  blob = storage.getFile(filepath)
-  if blob.exists() :
-    content_type = blob.content_type
-    image_data = blob.download_as_bytes()
-    filename = filepath.split('/')[-1]
-    return send_file(io.BytesIO(image_data), mimetype=content_type, as_attachment=False, download_name=filename)
+  cache = get_storage_cache()
+  immutable = is_content_addressed(filepath)
+
+  # Satu request metadata menggantikan exists() + download penuh, dan
+  # memastikan objek yang sudah dihapus tidak lagi dilayani dari cache
+  storage = get_storage()
+  blob = storage.getBlob(filepath)
+  if blob is None :
+    if cache and immutable :
+      cache.discard(cache_key(filepath))
+    return jsonify(
+      status=False,
+      message='File not found.'
+    ), 404
+
+  # Isi objek bernama hash tidak pernah berubah; nama lain di-cache per generation
+  key = cache_key(filepath) if immutable else cache_key(filepath, blob.generation)
+  if cache :
+    cached = cache.get(key)
+    if cached :
+      return send_object(filepath, *cached)
+
+  meta = {
+    'content_type': blob.content_type,
+    'etag': blob.md5_hash or str(blob.generation),
+    'size': blob.size,
+    'updated': blob.updated.timestamp() if blob.updated else None,
+  }
+  response = send_object(filepath, storage.openBlob(blob), meta)
+
+  # Salin ke cache disk sambil di-stream, hanya untuk response penuh
+  if cache and request.method == 'GET' and response.status_code == 200 :
+    response.response = cache.store(key, meta, response.response)
+  return response
+
+def send_object(filepath, file, meta) :
+  # Body di-stream per potongan; Range dan If-None-Match/If-Modified-Since
+  # ditangani make_conditional (206, 304 atau 416)
+  response = Response(
+    FileWrapper(file, STREAM_BUFFER_SIZE),
+    mimetype=meta['content_type'] or 'application/octet-stream',
+    direct_passthrough=True
+  )
+  response.content_length = meta['size']
+  response.set_etag(meta['etag'])
+  if meta['updated'] :
+    response.last_modified = datetime.fromtimestamp(meta['updated'], timezone.utc)
+  response.headers.set('Content-Disposition', 'inline', filename=filepath.split('/')[-1])
+
+  response.cache_control.public = True
+  if is_content_addressed(filepath) :
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+  else :
+    response.cache_control.max_age = MUTABLE_MAX_AGE
+
+  try :
+    return response.make_conditional(request.environ, accept_ranges=True, complete_length=meta['size'])
+  except RequestedRangeNotSatisfiable :
+    file.close()
+    raise
+
+@storage_route.route('/uploads', methods=['POST'])
+@auth.login_required
+def create_upload_url() :
+  data = request.get_json() or {}
+  try :
+    # Klien mengupload langsung ke bucket dengan PUT ke URL ini,
+    # lalu mengirim path-nya sebagai picture_path / avatar_path
+    upload = get_storage().createUploadUrl(data.get('dir'), data.get('content_type'), owner=get_jwt_identity())
+  except ValueError as e :
+    return jsonify(
+      status=False,
+      message=str(e)
+    ), 400
   return jsonify(
-    status=False,
-    message='File not found.'
-  )
\ No newline at end of file
+    status=True,
+    message='URL upload berhasil dibuat.',
+    data=upload
+  )
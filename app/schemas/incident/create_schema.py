@@ -1,7 +1,7 @@
 from marshmallow import Schema, fields, validate, ValidationError
 from marshmallow.decorators import validates
 from sqlalchemy.orm import Session
-from app.models.models import Resident, Institution
+from app.models.models import Resident, Institution, Label
 
 class CreateIncidentSchema(Schema):
     description = fields.String(
@@ -45,12 +45,25 @@ class CreateIncidentSchema(Schema):
             "invalid": "Format email tidak valid."
         }
     )
+    label = fields.String(
+        required=False,
+        validate=validate.OneOf([label.value for label in Label], error="Label harus salah satu dari: high, medium, low."),
+        error_messages={
+            "null": "Label tidak boleh kosong."
+        }
+    )
     picture = fields.String(
         required=False,
         error_messages={
             "null": "Gambar tidak boleh kosong."
         }
     )
+    picture_path = fields.String(
+        required=False,
+        error_messages={
+            "null": "Path gambar tidak boleh kosong."
+        }
+    )
 
     def __init__(self, db_session: Session, *args, **kwargs):
         # Inisialisasi skema dengan sesi database."""
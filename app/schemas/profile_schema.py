@@ -38,6 +38,18 @@ class BaseProfileSchema(Schema):
             "invalid": "Format alamat tidak valid."
         }
     )
+    avatar = fields.String(
+        required=False,
+        error_messages={
+            "null": "Avatar tidak boleh kosong."
+        }
+    )
+    avatar_path = fields.String(
+        required=False,
+        error_messages={
+            "null": "Path avatar tidak boleh kosong."
+        }
+    )
 
     def __init__(self, db_session: Session, user_id: int, *args, **kwargs):
         # Inisialisasi skema dengan sesi database dan ID pengguna.
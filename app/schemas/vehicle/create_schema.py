@@ -48,6 +48,12 @@ class CreateVehicleSchema(Schema):
             "null": "Gambar tidak boleh kosong."
         }
     )
+    picture_path = fields.String(
+        required=False,
+        error_messages={
+            "null": "Path gambar tidak boleh kosong."
+        }
+    )
 
     def __init__(self, db_session: Session, *args, **kwargs):
         # Inisialisasi skema dengan sesi database."""
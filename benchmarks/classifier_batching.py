@@ -0,0 +1,71 @@
+# Benchmark throughput/latensi: per-call predict vs MicroBatcher
+#
+# Jalankan dari root project:
+#   python -m benchmarks.classifier_batching --requests 400 --concurrency 16
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import SAMPLES, percentile
+from utils.inference_batcher import MicroBatcher
+from utils.text_classification import get_classifier
+
+def run(predict, total, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            text = random.choice(SAMPLES)
+            start = time.perf_counter()
+            predict(text)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    return duration, latencies
+
+def report(name, total, duration, latencies):
+    print(f"{name:<12} {total / duration:>9.1f} req/s   "
+          f"p50 {percentile(latencies, 50) * 1000:>7.1f} ms   "
+          f"p95 {percentile(latencies, 95) * 1000:>7.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:>7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--max-batch-size', type=int, default=16)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    classifier = get_classifier()
+
+    # Pemanasan agar graph Keras sudah terbentuk sebelum diukur
+    classifier.predict_batch(SAMPLES)
+
+    duration, latencies = run(classifier.predict, args.requests, args.concurrency)
+    report('per-call', args.requests, duration, latencies)
+
+    batcher = MicroBatcher(
+        classifier.predict_batch,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    duration, latencies = run(batcher.predict, args.requests, args.concurrency)
+    report('batched', args.requests, duration, latencies)
+
+if __name__ == '__main__':
+    main()
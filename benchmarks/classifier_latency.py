@@ -0,0 +1,54 @@
+# Benchmark latensi per request: model.predict vs fungsi inferensi ter-trace
+#
+# Jalankan dari root project (CPU):
+#   CUDA_VISIBLE_DEVICES= python -m benchmarks.classifier_latency --iterations 200
+import argparse
+import time
+
+import tensorflow as tf
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+from benchmarks.common import SAMPLES, percentile
+from utils.text_classification import get_classifier
+
+def measure(fn, batches, iterations):
+    latencies = []
+    for i in range(iterations):
+        padded = batches[i % len(batches)]
+        start = time.perf_counter()
+        fn(padded)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(name, latencies):
+    print(f"{name:<16} mean {sum(latencies) / len(latencies) * 1000:>7.2f} ms   "
+          f"p50 {percentile(latencies, 50) * 1000:>7.2f} ms   "
+          f"p95 {percentile(latencies, 95) * 1000:>7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    classifier = get_classifier()
+    batches = []
+    for text in SAMPLES:
+        sequence = classifier.tokenizer.texts_to_sequences([classifier.preprocess_text(text)])
+        batches.append(pad_sequences(sequence, padding='post', maxlen=classifier.MAX_SEQUENCE_LENGTH))
+
+    def keras_predict(padded):
+        return classifier.model.predict(padded, verbose=0)
+
+    def traced_infer(padded):
+        return classifier._infer(tf.constant(padded, dtype=tf.int32)).numpy()
+
+    # Pemanasan kedua jalur sebelum diukur
+    keras_predict(batches[0])
+    traced_infer(batches[0])
+
+    report('model.predict', measure(keras_predict, batches, args.iterations))
+    report('traced function', measure(traced_infer, batches, args.iterations))
+    report('end-to-end', measure(lambda _: classifier.predict(SAMPLES[0]), batches, args.iterations))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+# Utilitas bersama untuk script benchmark
+
+SAMPLES = [
+    "Terjadi kecelakaan mobil di jalan tol",
+    "Kebakaran rumah di dekat pasar",
+    "Banjir besar merendam perumahan warga",
+    "Ada orang pingsan di halte bus",
+    "Pohon tumbang menutup jalan raya",
+    "Kecelakaan motor, korban luka ringan",
+    "Asap tebal keluar dari gedung kantor",
+    "Anak kecil tenggelam di sungai",
+]
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
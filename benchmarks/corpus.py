@@ -0,0 +1,120 @@
+# Generator korpus deskripsi kejadian darurat berbahasa Indonesia
+#
+# Korpus dibuat deterministik dari seed agar hasil benchmark antar-run dan
+# antar-commit dapat dibandingkan. Contoh:
+#   python -m benchmarks.corpus --size 20 --seed 1
+import argparse
+import random
+
+EVENTS = [
+    "terjadi kecelakaan {vehicle} {place}",
+    "{vehicle} menabrak pembatas jalan {place}",
+    "tabrakan beruntun antara {vehicle} dan {vehicle2} {place}",
+    "kebakaran {building} {place}",
+    "api membakar {building} {place}, asap hitam terlihat dari jauh",
+    "korsleting listrik menyebabkan kebakaran {building} {place}",
+    "banjir setinggi {depth} cm merendam {building} {place}",
+    "air sungai meluap dan masuk ke {building} {place}",
+    "tanah longsor menimbun jalan {place}",
+    "pohon tumbang menimpa {vehicle} {place}",
+    "gempa membuat dinding {building} retak {place}",
+    "{person} pingsan {place}",
+    "{person} mengalami sesak napas {place}",
+    "{person} diduga terkena serangan jantung {place}",
+    "{person} jatuh dari tangga dan tidak sadarkan diri {place}",
+    "{person} tenggelam di sungai {place}",
+    "{person} terseret arus di pantai {place}",
+    "terjadi pencurian motor {place}",
+    "perampokan di minimarket {place}, pelaku membawa senjata tajam",
+    "perkelahian antarwarga {place}",
+    "kabel listrik putus dan memercikkan api {place}",
+    "kebocoran gas elpiji di {building} {place}",
+    "{person} digigit ular {place}",
+]
+
+VEHICLES = ["mobil", "motor", "truk", "bus", "angkot", "sepeda motor", "mobil pikap", "ojek online"]
+BUILDINGS = ["rumah warga", "gedung kantor", "ruko", "gudang", "sekolah", "pasar", "warung makan", "rumah kos", "masjid"]
+PERSONS = [
+    "seorang bapak", "seorang ibu", "anak kecil", "lansia", "pengendara motor",
+    "seorang pelajar", "pekerja bangunan", "ibu hamil", "pejalan kaki",
+]
+PLACES = [
+    "di jalan tol", "di dekat pasar", "di jalan raya", "di perempatan lampu merah",
+    "di halte bus", "di depan sekolah", "di gang sempit", "di kompleks perumahan",
+    "di Jl. Sudirman", "di Jl. Ahmad Yani", "di dekat stasiun", "di kawasan industri",
+    "di Kelurahan Sukamaju", "di Kecamatan Cibeunying", "di dekat jembatan", "di area parkir mal",
+]
+DETAILS = [
+    "", "", "",
+    "korban luka ringan",
+    "korban luka berat dan butuh ambulans",
+    "{count} orang terluka",
+    "{count} korban belum dievakuasi",
+    "tidak ada korban jiwa",
+    "lalu lintas macet total",
+    "warga sudah berusaha memadamkan api",
+    "mohon segera kirim bantuan",
+    "kondisi korban tidak sadarkan diri",
+    "situasi masih berbahaya",
+]
+
+# Singkatan yang umum dipakai pelapor saat mengetik cepat
+SLANG = {
+    "yang": "yg", "dengan": "dgn", "tidak": "tdk", "sudah": "sdh",
+    "segera": "sgr", "orang": "org", "dekat": "dkt", "jalan": "jln",
+}
+
+def _fill(template, rng):
+    return template.format(
+        vehicle=rng.choice(VEHICLES),
+        vehicle2=rng.choice(VEHICLES),
+        building=rng.choice(BUILDINGS),
+        person=rng.choice(PERSONS),
+        place=rng.choice(PLACES),
+        depth=rng.choice([30, 50, 80, 100, 150]),
+        count=rng.randint(2, 12),
+    )
+
+def _style(text, rng):
+    if rng.random() < 0.3:
+        for word, short in SLANG.items():
+            text = text.replace(word, short)
+    style = rng.random()
+    if style < 0.5:
+        text = text[0].upper() + text[1:]
+    elif style < 0.6:
+        text = text.upper()
+    if rng.random() < 0.4:
+        text += rng.choice([".", "!", "!!", " tolong!", " cepat!!"])
+    return text
+
+def generate_corpus(size, seed=0):
+    """
+    Generate realistic Indonesian emergency descriptions
+
+    :param size: Number of descriptions
+    :param seed: Random seed; the same seed always gives the same corpus
+    :return: List of description strings
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = [_fill(rng.choice(EVENTS), rng)]
+        for _ in range(rng.choice([0, 1, 1, 2])):
+            detail = _fill(rng.choice(DETAILS), rng)
+            if detail:
+                parts.append(detail)
+        corpus.append(_style(', '.join(parts), rng))
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for text in generate_corpus(args.size, args.seed):
+        print(text)
+
+if __name__ == '__main__':
+    main()
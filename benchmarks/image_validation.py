@@ -0,0 +1,76 @@
+# Benchmark tahap-tahap upload gambar: hash isi, inspect_image (header saja)
+# dan normalisasi ke WebP, sebagaimana dijalankan uploadStream
+#
+# Jalankan dari root project:
+#   python -m benchmarks.image_validation --sizes 2 8 16
+#
+# Tiap tahap memanggil method yang sama dengan jalur upload API. Kolom terakhir
+# adalah uploadBinary utuh ke LocalStorage di direktori sementara, termasuk
+# penulisan file, sehingga tidak membutuhkan GCS.
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image
+
+from utils.images import inspect_image, normalize_image
+from utils.local_storage import LocalStorage
+
+def make_image(fmt, megabytes):
+    # Noise acak hampir tidak terkompresi sehingga ukuran file mudah diatur
+    side = int((megabytes * 1024 * 1024 / 3) ** 0.5)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    output = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(output, fmt, quality=100)
+    else:
+        image.save(output, fmt, compress_level=1)
+    return output.getvalue()
+
+def measure(fn, repeat):
+    tracemalloc.start()
+    cpu = time.process_time()
+    for _ in range(repeat):
+        fn()
+    cpu = (time.process_time() - cpu) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=float, nargs='+', default=[2, 8, 16], help="Image sizes in MB")
+    parser.add_argument('--formats', nargs='+', default=['JPEG', 'PNG'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='upload-bench-')
+    try:
+        storage = LocalStorage(root)
+        for fmt in args.formats:
+            for size in args.sizes:
+                raw = make_image(fmt, size)
+
+                def upload():
+                    path = storage.uploadBinary(io.BytesIO(raw), dir='bench')
+                    # Lepas lagi agar tiap ulangan benar-benar menulis objek baru
+                    storage.deleteFile(path)
+
+                stages = (
+                    ('hash', lambda: storage._hashStream(io.BytesIO(raw))),
+                    ('inspect', lambda: inspect_image(io.BytesIO(raw))),
+                    ('normalize', lambda: normalize_image(io.BytesIO(raw))),
+                    ('upload', upload),
+                )
+                for name, fn in stages:
+                    cpu, peak = measure(fn, args.repeat)
+                    print(f"{fmt:<5} {size:>6.1f} MB  {name:<10} cpu {cpu * 1000:>9.2f} ms   peak {peak / 1024 / 1024:>8.2f} MB")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Ukur skip rate pre-classifier kata kunci dan latensi LSTM yang dihemat
+#
+# Jalankan dari root project:
+#   python -m benchmarks.keyword_shortcut --threshold 0.95
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import SAMPLES
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threshold', type=float, default=0.95)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # Threshold harus diatur sebelum classifier dimuat; cache praproses dimatikan
+    os.environ['CLASSIFIER_KEYWORD_THRESHOLD'] = str(args.threshold)
+    os.environ['CLASSIFIER_TEXT_CACHE_SIZE'] = '0'
+    from utils.text_classification import EmergencyCaseClassifier
+    classifier = EmergencyCaseClassifier()
+
+    texts = SAMPLES + [f'{a} {b}' for a in SAMPLES for b in SAMPLES if a != b]
+
+    model_labels = classifier.predict_scores(texts).argmax(axis=1)
+    shortcut_labels = classifier.predict_proba(texts).argmax(axis=1)
+    agreement = float(np.mean(model_labels == shortcut_labels))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            classifier.predict_scores([text])
+    model_only = (time.perf_counter() - start) / (args.repeat * len(texts))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            classifier.predict_proba([text])
+    with_shortcut = (time.perf_counter() - start) / (args.repeat * len(texts))
+
+    stats = classifier.shortcut_stats()
+    print(f"threshold {args.threshold}: skip rate {stats['skip_rate'] * 100:.1f}% "
+          f"({stats['skipped']}/{stats['requests']}), label agreement with LSTM {agreement * 100:.1f}%")
+    print(f"per text: LSTM only {model_only * 1000:.2f} ms, with shortcut {with_shortcut * 1000:.2f} ms, "
+          f"saved {(model_only - with_shortcut) * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
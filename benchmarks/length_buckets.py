@@ -0,0 +1,50 @@
+# Benchmark padding per bucket panjang vs padding penuh MAX_SEQUENCE_LENGTH
+#
+# Jalankan dari root project:
+#   python -m benchmarks.length_buckets --iterations 50
+#
+# Bucketing hanya aktif jika Embedding model memakai mask_zero=True;
+# selain itu output akan berubah dan classifier tetap memakai padding penuh.
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import SAMPLES
+from utils.text_classification import get_classifier
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64])
+    args = parser.parse_args()
+
+    classifier = get_classifier()
+    buckets = classifier.length_buckets
+    if not buckets:
+        print("Length bucketing is disabled for this model (no mask_zero Embedding); nothing to compare.")
+        return
+    print(f"buckets: {buckets}")
+
+    for batch_size in args.batch_sizes:
+        texts = [SAMPLES[i % len(SAMPLES)] for i in range(batch_size)]
+        classifier.predict_scores(texts)
+
+        classifier.length_buckets = None
+        full_time, full_scores = timed(lambda: classifier.predict_scores(texts), args.iterations)
+        classifier.length_buckets = buckets
+        bucket_time, bucket_scores = timed(lambda: classifier.predict_scores(texts), args.iterations)
+
+        diff = float(np.abs(full_scores - bucket_scores).max())
+        print(f"batch {batch_size:>4}: full {full_time * 1000:>8.2f} ms   "
+              f"bucketed {bucket_time * 1000:>8.2f} ms   "
+              f"speedup {full_time / bucket_time:>5.2f}x   max |diff| {diff:.2e}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Uji kesetaraan akurasi dan benchmark latensi/memori: backend keras vs tflite
+#
+# Ekspor model lite terlebih dulu:
+#   flask classifier export-lite [--quantize]
+# lalu jalankan dari root project:
+#   python -m benchmarks.lite_backend --iterations 200
+#
+# Tiap backend dijalankan di proses terpisah agar waktu muat dan memori
+# (ru_maxrss) tidak saling mempengaruhi. Keluar dengan status 1 jika label
+# yang sama kurang dari --min-agreement.
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.common import SAMPLES, percentile
+
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from utils.text_classification import EmergencyCaseClassifier
+classifier = EmergencyCaseClassifier(backend=sys.argv[1])
+loaded = time.perf_counter()
+texts = json.loads(sys.argv[2])
+iterations = int(sys.argv[3])
+scores = classifier.predict_scores(texts).tolist()
+latencies = []
+for i in range(iterations):
+    start = time.perf_counter()
+    classifier.predict_scores([texts[i % len(texts)]])
+    latencies.append(time.perf_counter() - start)
+print(json.dumps({
+    'load': loaded - started,
+    'scores': scores,
+    'latencies': latencies,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+'''
+
+def probe(backend, texts, iterations):
+    # Cache praproses dimatikan agar latensi mengukur jalur penuh
+    env = dict(os.environ, CLASSIFIER_TEXT_CACHE_SIZE='0')
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, backend, json.dumps(texts), str(iterations)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--min-agreement', type=float, default=0.99)
+    args = parser.parse_args()
+
+    texts = SAMPLES + [f'{a} {b}' for a in SAMPLES for b in SAMPLES if a != b]
+    results = {backend: probe(backend, texts, args.iterations) for backend in ('keras', 'tflite')}
+
+    print(f"{'backend':<8} {'load':>8} {'p50':>10} {'p95':>10} {'max RSS':>10}")
+    for backend, result in results.items():
+        print(f"{backend:<8} {result['load']:>7.2f}s "
+              f"{percentile(result['latencies'], 50) * 1000:>8.2f}ms "
+              f"{percentile(result['latencies'], 95) * 1000:>8.2f}ms "
+              f"{result['maxrss_kb'] / 1024:>8.1f}MB")
+
+    keras_scores = np.array(results['keras']['scores'])
+    lite_scores = np.array(results['tflite']['scores'])
+    agreement = float(np.mean(keras_scores.argmax(axis=1) == lite_scores.argmax(axis=1)))
+    max_diff = float(np.abs(keras_scores - lite_scores).max())
+    print(f"\nlabel agreement: {agreement * 100:.2f}% over {len(texts)} texts, max |score diff|: {max_diff:.5f}")
+
+    if agreement < args.min_agreement:
+        print(f"FAIL: agreement below {args.min_agreement * 100:.2f}%")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Benchmark cold start: waktu hingga request pertama terlayani dan hingga
+# classifier siap, untuk tiap CLASSIFIER_LOAD_MODE. Tiap mode dijalankan di
+# proses Python baru agar import benar-benar dingin.
+#
+# Jalankan dari root project:
+#   python -m benchmarks.startup_time --runs 3
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+response = app.test_client().get('/')
+assert response.status_code == 200
+served = time.perf_counter()
+from utils.text_classification import get_classifier
+get_classifier()
+ready = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'first_response': served - start,
+    'classifier_ready': ready - start,
+}))
+'''
+
+def probe(mode):
+    env = dict(os.environ, CLASSIFIER_LOAD_MODE=mode)
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', default=['eager', 'background', 'lazy'])
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'import':>10} {'first resp':>12} {'clf ready':>12}")
+    for mode in args.modes:
+        results = [probe(mode) for _ in range(args.runs)]
+        best = {key: min(result[key] for result in results) for key in results[0]}
+        print(f"{mode:<12} {best['import']:>9.2f}s {best['first_response']:>11.2f}s {best['classifier_ready']:>11.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Benchmark throughput penyimpanan lokal: upload (hash, normalisasi, dedup) dan
+# baca ulang objek seperti proxy /storage, dengan read() biasa vs mmap
+#
+# Jalankan dari root project:
+#   python -m benchmarks.storage_throughput --images 200 --threads 4
+#
+# Tidak membutuhkan GCS maupun kredensial: objek ditulis ke direktori sementara.
+# Untuk load test proxy HTTP, jalankan aplikasi dengan STORAGE_BACKEND=local.
+import argparse
+import io
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from utils.local_storage import LocalStorage
+
+def make_images(count, size):
+    rng = random.Random(0)
+    images = []
+    for _ in range(count):
+        # Noise agar ukuran hasil kompresi mendekati foto asli
+        image = Image.merge('RGB', [Image.effect_noise((size, size), rng.randrange(20, 60)) for _ in range(3)])
+        # Satu piksel acak agar tiap gambar punya hash berbeda
+        image.putpixel((rng.randrange(size), rng.randrange(size)), (0, 0, 0))
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=90)
+        images.append(output.getvalue())
+    return images
+
+def upload_all(storage, images, threads):
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(lambda raw: storage.uploadBinary(io.BytesIO(raw), dir='bench'), images))
+
+def read_all(storage, paths, threads, buffer_size=64 * 1024):
+    def read(path):
+        total = 0
+        with storage.openBlob(storage.getBlob(path)) as file:
+            for chunk in iter(lambda: file.read(buffer_size), b''):
+                total += len(chunk)
+        return total
+
+    with ThreadPoolExecutor(threads) as pool:
+        return sum(pool.map(read, paths))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--size', type=int, default=1200, help="Image side in px")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--reads', type=int, default=5, help="Read passes over all objects")
+    args = parser.parse_args()
+
+    images = make_images(args.images, args.size)
+    root = tempfile.mkdtemp(prefix='storage-bench-')
+    try:
+        storage = LocalStorage(root)
+        start = time.perf_counter()
+        paths = upload_all(storage, images, args.threads)
+        elapsed = time.perf_counter() - start
+        print(f"upload        {len(paths) / elapsed:>8.1f} images/s   ({sum(map(len, images)) / elapsed / 1024 / 1024:.1f} MB/s input)")
+
+        # Upload ulang gambar yang sama hanya menambah referensi
+        start = time.perf_counter()
+        upload_all(storage, images, args.threads)
+        elapsed = time.perf_counter() - start
+        print(f"re-upload     {len(paths) / elapsed:>8.1f} images/s   (deduplicated)")
+
+        paths = paths * args.reads
+        for name, mmap_reads in (('read', False), ('read (mmap)', True)):
+            storage.mmap_reads = mmap_reads
+            start = time.perf_counter()
+            total = read_all(storage, paths, args.threads)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<13} {len(paths) / elapsed:>8.1f} objects/s  ({total / elapsed / 1024 / 1024:.1f} MB/s)")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == '__main__':
+    main()
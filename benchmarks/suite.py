@@ -0,0 +1,149 @@
+# Suite benchmark & regresi EmergencyCaseClassifier
+#
+# Jalankan dari root project:
+#   python -m benchmarks.suite --save-baseline   # simpan baseline mesin ini
+#   python -m benchmarks.suite --check           # gagal (exit 1) jika regresi
+#
+# Mengukur waktu muat dingin, persentil latensi satu teks, throughput batch
+# dan memori resident (max RSS). Tiap run memakai proses baru agar waktu muat
+# dan memori tidak dipengaruhi run sebelumnya. Baseline bergantung pada mesin,
+# jadi disimpan lokal di benchmarks/baseline.json (di-ignore git).
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import percentile
+from benchmarks.corpus import generate_corpus
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Nama metrik -> True jika nilai lebih besar lebih baik
+METRICS = {
+    'cold_load_s': False,
+    'latency_p50_ms': False,
+    'latency_p95_ms': False,
+    'latency_p99_ms': False,
+    'throughput_b16_per_s': True,
+    'throughput_b64_per_s': True,
+    'max_rss_mb': False,
+}
+
+def probe(backend, corpus_size, iterations, seed):
+    """Measure the classifier in the current (fresh) process"""
+    import resource
+    import time
+
+    started = time.perf_counter()
+    from utils.text_classification import EmergencyCaseClassifier
+    classifier = EmergencyCaseClassifier(backend=backend)
+    cold_load = time.perf_counter() - started
+
+    corpus = generate_corpus(corpus_size, seed)
+    classifier.predict_batch(corpus[:16])
+
+    latencies = []
+    for i in range(iterations):
+        text = corpus[i % len(corpus)]
+        start = time.perf_counter()
+        classifier.predict(text)
+        latencies.append(time.perf_counter() - start)
+
+    results = {
+        'cold_load_s': cold_load,
+        'latency_p50_ms': percentile(latencies, 50) * 1000,
+        'latency_p95_ms': percentile(latencies, 95) * 1000,
+        'latency_p99_ms': percentile(latencies, 99) * 1000,
+    }
+    for batch_size in (16, 64):
+        batches = [corpus[i:i + batch_size] for i in range(0, len(corpus) - batch_size + 1, batch_size)]
+        start = time.perf_counter()
+        for batch in batches:
+            classifier.predict_batch(batch)
+        results[f'throughput_b{batch_size}_per_s'] = len(batches) * batch_size / (time.perf_counter() - start)
+
+    results['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+def run(backend, corpus_size, iterations, seed):
+    # Cache deskripsi dimatikan agar tiap panggilan melewati jalur praproses penuh
+    env = dict(os.environ, CLASSIFIER_TEXT_CACHE_SIZE='0')
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '--probe', '--backend', backend,
+         '--corpus-size', str(corpus_size), '--iterations', str(iterations), '--seed', str(seed)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def median_results(runs):
+    return {name: percentile([result[name] for result in runs], 50) for name in METRICS}
+
+def compare(results, baseline, tolerance):
+    """
+    :return: List of (metric, baseline, current, change) that regressed beyond tolerance
+    """
+    regressions = []
+    for name, higher_is_better in METRICS.items():
+        if name not in baseline:
+            continue
+        change = (results[name] - baseline[name]) / baseline[name]
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append((name, baseline[name], results[name], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=['keras', 'tflite'], default=os.getenv('CLASSIFIER_BACKEND', 'keras'))
+    parser.add_argument('--corpus-size', type=int, default=512)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=3, help="Fresh processes per measurement; the median is used")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed relative regression per metric")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true')
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        print(json.dumps(probe(args.backend, args.corpus_size, args.iterations, args.seed)))
+        return
+
+    results = median_results([
+        run(args.backend, args.corpus_size, args.iterations, args.seed) for _ in range(args.runs)
+    ])
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baselines = json.load(handle)
+    baseline = baselines.get(args.backend, {})
+
+    print(f"backend {args.backend}, corpus {args.corpus_size} texts, median of {args.runs} run(s)")
+    for name in METRICS:
+        line = f"  {name:<22} {results[name]:>10.2f}"
+        if name in baseline:
+            line += f"   baseline {baseline[name]:>10.2f}   {(results[name] - baseline[name]) / baseline[name] * 100:>+6.1f}%"
+        print(line)
+
+    if args.save_baseline:
+        baselines[args.backend] = results
+        with open(args.baseline, 'w') as handle:
+            json.dump(baselines, handle, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print(f"\nNo baseline for backend {args.backend}; run with --save-baseline first.")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} metric(s) regressed more than {args.tolerance * 100:.0f}%:")
+            for name, before, after, change in regressions:
+                print(f"  {name}: {before:.2f} -> {after:.2f} ({change * 100:+.1f}%)")
+            sys.exit(1)
+        print("\nOK: no regressions beyond tolerance.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Benchmark memori upload base64: decode penuh lalu upload (cara lama) vs
+# uploadFile yang men-decode per potongan
+#
+# Jalankan dari root project:
+#   python -m benchmarks.upload_memory --sizes 1 10 25
+#
+# Keduanya menjalankan uploadStream yang sebenarnya (hash, inspect header, tulis
+# objek) ke LocalStorage di direktori sementara, jadi tidak membutuhkan GCS.
+# Normalisasi WebP dimatikan kecuali dengan --normalize, agar yang diukur adalah
+# decode upload. String base64 sendiri (body JSON) sudah ada di memori sebelum
+# pengukuran dan tidak ikut dihitung.
+import argparse
+import base64
+import io
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image
+
+import utils.storage
+from utils.local_storage import LocalStorage
+
+def make_image(megabytes):
+    # Noise acak hampir tidak terkompresi sehingga ukuran file mudah diatur
+    side = int((megabytes * 1024 * 1024 / 3) ** 0.5)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=100)
+    return output.getvalue()
+
+def full_decode(storage, data):
+    # uploadFile lama: seluruh file di-decode ke memori sebelum diupload
+    return storage.uploadBinary(io.BytesIO(base64.b64decode(data.split(',')[1])), dir='bench')
+
+def streamed_decode(storage, data):
+    return storage.uploadFile(data, dir='bench')
+
+def measure(fn, data):
+    # Direktori baru tiap pengukuran: upload ulang file yang sama hanya menambah referensi
+    root = tempfile.mkdtemp(prefix='upload-bench-')
+    try:
+        storage = LocalStorage(root)
+        tracemalloc.start()
+        start = time.perf_counter()
+        path = fn(storage, data)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(root)
+    if path is None:
+        raise SystemExit("Upload gagal, lihat pesan error di atas.")
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 10, 25], help="Image sizes in MB")
+    parser.add_argument('--normalize', action='store_true', help="Include WebP normalization")
+    args = parser.parse_args()
+
+    utils.storage.NORMALIZE_IMAGES = args.normalize
+    for size in args.sizes:
+        data = 'data:image/jpeg;base64,' + base64.b64encode(make_image(size)).decode()
+
+        for name, fn in (('full decode', full_decode), ('streamed', streamed_decode)):
+            elapsed, peak = measure(fn, data)
+            print(f"{size:>6.1f} MB  {name:<12} peak {peak / 1024 / 1024:>8.2f} MB   {elapsed * 1000:>8.1f} ms")
+
+if __name__ == '__main__':
+    main()
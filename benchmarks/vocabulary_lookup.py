@@ -0,0 +1,54 @@
+# Benchmark & uji kesetaraan: Tokenizer Keras + pad_sequences vs CompiledVocabulary
+#
+# Jalankan dari root project:
+#   python -m benchmarks.vocabulary_lookup --iterations 200
+#
+# Keluar dengan status 1 jika matriks hasil kedua jalur berbeda.
+import argparse
+import sys
+import time
+
+import numpy as np
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+from benchmarks.corpus import generate_corpus
+from utils.text_classification import EmergencyCaseClassifier
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64])
+    args = parser.parse_args()
+
+    classifier = EmergencyCaseClassifier(backend='keras', load_model=False)
+    maxlen = classifier.MAX_SEQUENCE_LENGTH
+    corpus = [classifier.preprocess_text(text) for text in generate_corpus(max(args.batch_sizes) * 4)]
+
+    def keras_encode(tokens):
+        sequences = classifier.tokenizer.texts_to_sequences(tokens)
+        return pad_sequences(sequences, padding='post', maxlen=maxlen).astype(np.int32)
+
+    failed = False
+    for batch_size in args.batch_sizes:
+        tokens = corpus[:batch_size]
+        keras_time, expected = timed(lambda: keras_encode(tokens), args.iterations)
+        compiled_time, (matrix, _) = timed(lambda: classifier.vocabulary.encode(tokens, maxlen), args.iterations)
+
+        same = np.array_equal(expected, matrix)
+        failed = failed or not same
+        print(f"batch {batch_size:>4}: keras {keras_time * 1e6:>9.1f} us   "
+              f"compiled {compiled_time * 1e6:>9.1f} us   "
+              f"speedup {keras_time / compiled_time:>5.2f}x   {'identical' if same else 'MISMATCH'}")
+
+    if failed:
+        print("FAIL: compiled vocabulary differs from the Keras tokenizer")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Laporan memori per worker gunicorn untuk tiap CLASSIFIER_LOAD_MODE
+#
+# Menjalankan gunicorn dengan gunicorn.conf.py, menunggu classifier siap,
+# lalu membaca /proc/<pid>/smaps_rollup (Linux) untuk master dan worker.
+# PSS membagi halaman bersama secara proporsional, jadi jumlah PSS adalah
+# total memori nyata yang dipakai semua proses.
+#
+# Jalankan dari root project:
+#   python -m benchmarks.worker_memory --workers 4 --modes background preload
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+def read_rollup(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as handle:
+        for line in handle:
+            parts = line.split()
+            key = parts[0].rstrip(':')
+            if key in FIELDS:
+                values[key] = int(parts[1])  # kB
+    return values
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as handle:
+        return [int(child) for child in handle.read().split()]
+
+def wait_ready(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/ready') as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError('Classifier did not become ready in time.')
+
+def measure(mode, workers, port, timeout, settle):
+    env = dict(
+        os.environ,
+        CLASSIFIER_LOAD_MODE=mode,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+    )
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port, timeout)
+        # Beri waktu worker lain menyelesaikan pemuatan model
+        time.sleep(settle)
+        return read_rollup(master.pid), [read_rollup(pid) for pid in children(master.pid)]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+
+def mb(kb):
+    return f'{kb / 1024:>8.1f}'
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--settle', type=float, default=20)
+    parser.add_argument('--modes', nargs='+', default=['background', 'preload'])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        master, workers = measure(mode, args.workers, args.port, args.timeout, args.settle)
+        print(f"\n== {mode} ({len(workers)} workers) ==  values in MB")
+        print(f"{'process':<10}" + ''.join(f'{field:>14}' for field in FIELDS))
+        print(f"{'master':<10}" + ''.join(f'{mb(master[field]):>14}' for field in FIELDS))
+        for index, worker in enumerate(workers):
+            print(f"{'worker ' + str(index):<10}" + ''.join(f'{mb(worker[field]):>14}' for field in FIELDS))
+        total_pss = master['Pss'] + sum(worker['Pss'] for worker in workers)
+        print(f"total PSS: {mb(total_pss).strip()} MB")
+
+if __name__ == '__main__':
+    main()
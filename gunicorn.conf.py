@@ -0,0 +1,19 @@
+# Konfigurasi gunicorn
+#
+# CLASSIFIER_LOAD_MODE=preload memuat tokenizer, label encoder, stemmer dan
+# modul TensorFlow sekali di master (preload_app) lalu dibagi ke worker lewat
+# copy-on-write. Model Keras dibangun di tiap worker setelah fork.
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8080')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+
+preload_app = os.getenv('CLASSIFIER_LOAD_MODE', 'background').strip().lower() == 'preload'
+
+def post_fork(server, worker):
+    if preload_app:
+        from utils.text_classification import pool_enabled, start_classifier_loading
+        # Dengan CLASSIFIER_POOL_SOCKET model hanya dimuat di proses pool
+        if not pool_enabled():
+            start_classifier_loading()
@@ -6,5 +6,9 @@ def StorageURL(filename):
     :param filename: Path in the bucket, e.g., 'vehicles/image.png'.
     :return: Full URL to access the file in GCS.
     """
+    # Penyimpanan lokal tidak punya URL publik; file dilayani proxy /storage
+    if os.getenv('STORAGE_BACKEND', 'gcs').strip().lower() == 'local':
+        return f"/storage/{filename}"
+
     bucket_name = os.getenv('BUCKET_NAME')  # Nama bucket GCS
     return f"https://storage.googleapis.com/{bucket_name}/{filename}"
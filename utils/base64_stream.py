@@ -0,0 +1,51 @@
+import base64
+import io
+
+class Base64Stream(io.RawIOBase):
+    def __init__(self, data, chunk_size=1024 * 1024):
+        """
+        Read-only stream that decodes a base64 string one chunk at a time
+
+        Only about chunk_size decoded bytes are held at once, instead of the
+        whole file as with base64.b64decode.
+
+        :param data: Base64 string, optionally prefixed with a data:image URI header
+        :param chunk_size: Approximate number of decoded bytes per chunk
+        """
+        self._data = data
+        self._pos = data.index(',') + 1 if data.startswith('data:image') else 0
+        self._chars = max(1, chunk_size // 3) * 4
+        self._carry = ''
+        self._decoded = b''
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._offset >= len(self._decoded):
+            if self._pos >= len(self._data) and not self._carry:
+                return 0
+            self._decoded = self._decode_next()
+            self._offset = 0
+
+        size = min(len(buffer), len(self._decoded) - self._offset)
+        buffer[:size] = self._decoded[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def _decode_next(self):
+        chunk = self._data[self._pos:self._pos + self._chars]
+        self._pos += len(chunk)
+
+        # Abaikan whitespace (mis. base64 yang dipecah per baris) seperti b64decode
+        # (split tanpa whitespace mengembalikan string yang sama, tanpa salinan)
+        parts = chunk.split(None, 1)
+        if len(parts) != 1 or len(parts[0]) != len(chunk):
+            chunk = ''.join(chunk.split())
+        chunk = self._carry + chunk
+
+        # Decode per kelompok 4 karakter; sisanya dibawa ke potongan berikutnya
+        usable = len(chunk) if self._pos >= len(self._data) else len(chunk) - len(chunk) % 4
+        self._carry = chunk[usable:]
+        return base64.b64decode(chunk[:usable])
@@ -0,0 +1,70 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.models import Incident, LabelStatus
+from utils.env import env_flag
+from utils.text_classification import classify_emergency_case
+
+# Antrian klasifikasi di background (aktif jika CLASSIFIER_ASYNC=true).
+# Incident disimpan dulu dengan label sementara, lalu label diperbarui di sini.
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+def async_classification_enabled():
+    return env_flag('CLASSIFIER_ASYNC')
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = int(os.getenv('CLASSIFIER_ASYNC_WORKERS', 2))
+                _slots = threading.BoundedSemaphore(int(os.getenv('CLASSIFIER_ASYNC_MAX_PENDING', 256)))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='classification-job')
+    return _executor
+
+def enqueue_classification(incident_id, text):
+    """
+    Classify an incident in the background and update its label when done
+
+    When the queue is full the incident is classified synchronously instead.
+
+    :param incident_id: ID of the committed incident
+    :param text: Incident description to classify
+    """
+    app = current_app._get_current_object()
+    executor = _get_executor()
+
+    if not _slots.acquire(blocking=False):
+        logging.warning(f"Classification queue is full, classifying incident {incident_id} inline.")
+        _classify_incident(app, incident_id, text)
+        return
+
+    future = executor.submit(_classify_incident, app, incident_id, text)
+    future.add_done_callback(lambda _: _slots.release())
+
+def _classify_incident(app, incident_id, text):
+    with app.app_context():
+        values = {}
+        try:
+            classification = classify_emergency_case(text)
+            values['label'] = classification.label
+            values['model_version'] = classification.model_version
+            # Label fallback tetap pending agar diulang `incidents reclassify --only-pending`
+            values['label_status'] = LabelStatus.PENDING if classification.fallback else LabelStatus.CLASSIFIED
+        except Exception as e:
+            logging.error(f"Background classification of incident {incident_id} failed: {e}")
+            values['label_status'] = LabelStatus.FAILED
+
+        try:
+            Incident.query.filter_by(id=incident_id).update(values)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to store label of incident {incident_id}: {e}")
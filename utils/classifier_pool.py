@@ -0,0 +1,240 @@
+# Pool proses classifier di luar worker gunicorn
+#
+# Server dijalankan sebagai proses terpisah:
+#   python -m utils.classifier_pool --socket /tmp/instahelp-classifier.sock --processes 2
+# dan worker Flask mengirim teks lewat Unix socket (CLASSIFIER_POOL_SOCKET).
+# Server dan worker harus memakai CLASSIFIER_POOL_AUTHKEY rahasia yang sama.
+import argparse
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+
+class ClassifierPoolError(RuntimeError):
+    """Base error for classifications the pool could not complete"""
+
+class PoolSaturatedError(ClassifierPoolError):
+    """The pool's queue is full"""
+
+class PoolTimeoutError(ClassifierPoolError):
+    """The pool did not answer in time"""
+
+class PoolUnavailableError(ClassifierPoolError):
+    """The pool server cannot be reached"""
+
+class PoolPredictionError(ClassifierPoolError):
+    """A pool process failed to classify the text"""
+
+# Pesan ping dari klien; dijawab dengan status pool, bukan klasifikasi
+PING = None
+
+def _authkey():
+    # Koneksi bertukar pickle, jadi kunci wajib rahasia dan tidak punya default
+    authkey = os.getenv('CLASSIFIER_POOL_AUTHKEY', '').strip()
+    if not authkey:
+        raise ValueError("CLASSIFIER_POOL_AUTHKEY must be set to use the classifier pool.")
+    return authkey.encode()
+
+def _init_worker():
+    from utils.text_classification import get_classifier
+    get_classifier()
+
+def _classify(text):
+    from utils.text_classification import classify_texts
+    return tuple(classify_texts([text])[0])
+
+class ClassifierPoolServer:
+    def __init__(self, socket_path, processes=2, max_pending=32):
+        """
+        Serve classifications from a pool of classifier processes over a Unix socket
+
+        :param socket_path: Path of the Unix socket to listen on
+        :param processes: Number of classifier processes
+        :param max_pending: Maximum number of queued or running classifications
+        :raises ValueError: If CLASSIFIER_POOL_AUTHKEY is not set
+        """
+        self.socket_path = socket_path
+        self.authkey = _authkey()
+        self.processes = processes
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.status = 'loading'
+
+    def serve_forever(self):
+        self._start_executor()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        with Listener(self.socket_path, family='AF_UNIX', authkey=self.authkey) as listener:
+            logging.info(f"Classifier pool listening on {self.socket_path}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except Exception as e:
+                    logging.warning(f"Rejected classifier pool connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _start_executor(self):
+        # Proses classifier dibuat dengan spawn agar tidak mewarisi state TensorFlow
+        self.status = 'loading'
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=get_context('spawn'),
+            initializer=_init_worker,
+        )
+        # Klasifikasi pertama memuat model; status menjadi ready setelah berhasil
+        threading.Thread(target=self._warm_up, args=(self._executor,), daemon=True).start()
+
+    def _warm_up(self, executor):
+        try:
+            executor.submit(_classify, 'tes').result()
+            status = 'ready'
+        except Exception as e:
+            logging.error(f"Classifier pool failed to load the model: {e}")
+            status = 'failed'
+        if executor is self._executor:
+            self.status = status
+
+    def _replace_executor(self, broken):
+        # Proses yang mati (mis. OOM) membuat ProcessPoolExecutor rusak permanen
+        with self._executor_lock:
+            if self._executor is broken:
+                logging.error("Classifier pool process died, restarting the pool.")
+                broken.shutdown(wait=False)
+                self._start_executor()
+
+    def _classify(self, text):
+        executor = self._executor
+        try:
+            return ('ok', executor.submit(_classify, text).result())
+        except BrokenProcessPool as e:
+            self._replace_executor(executor)
+            return ('error', f"Classifier pool process died: {e}")
+        except Exception as e:
+            return ('error', str(e))
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    text = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                if text is PING:
+                    reply = ('ok', self.status)
+                elif not self._slots.acquire(blocking=False):
+                    reply = ('saturated', None)
+                else:
+                    try:
+                        reply = self._classify(text)
+                    finally:
+                        self._slots.release()
+
+                try:
+                    connection.send(reply)
+                except OSError:
+                    # Klien sudah menutup koneksi (mis. karena timeout)
+                    return
+
+class ClassifierPoolClient:
+    def __init__(self, socket_path, timeout=2.0):
+        """
+        Client for ClassifierPoolServer, one connection per thread
+
+        :param socket_path: Path of the server's Unix socket
+        :param timeout: Seconds to wait for a label before giving up
+        :raises ValueError: If CLASSIFIER_POOL_AUTHKEY is not set
+        """
+        self.socket_path = socket_path
+        self.authkey = _authkey()
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def predict(self, text, timeout=None):
+        """
+        Classify a text in the pool
+
+        :param text: Input text to classify
+        :param timeout: Seconds to wait, defaults to the client's timeout
+        :return: Predicted label
+        """
+        return self.classify(text, timeout)[0]
+
+    def classify(self, text, timeout=None):
+        """
+        Classify a text in the pool
+
+        :param text: Input text to classify
+        :param timeout: Seconds to wait, defaults to the client's timeout
+        :return: Tuple (label, confidence, model_version)
+        """
+        if not text.strip():
+            raise ValueError("Input text is empty.")
+
+        status, value = self._request(text, self.timeout if timeout is None else timeout)
+        if status == 'saturated':
+            raise PoolSaturatedError("Classifier pool is saturated.")
+        if status == 'error':
+            raise PoolPredictionError(f"Prediction error: {value}")
+        return value
+
+    def status(self, timeout=None):
+        """
+        Ask the pool whether its processes have loaded the model
+
+        :return: 'ready', 'loading' or 'failed', or 'unavailable' if the
+                 server cannot be reached
+        """
+        try:
+            return self._request(PING, self.timeout if timeout is None else timeout)[1]
+        except ClassifierPoolError:
+            return 'unavailable'
+
+    def _request(self, message, timeout):
+        connection = self._connection()
+        try:
+            connection.send(message)
+            if not connection.poll(timeout):
+                # Jawaban yang terlambat akan mengacaukan request berikutnya
+                self._reset()
+                raise PoolTimeoutError("Classifier pool did not answer in time.")
+            return connection.recv()
+        except (EOFError, OSError) as e:
+            self._reset()
+            raise PoolUnavailableError(f"Classifier pool connection lost: {e}")
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            try:
+                connection = Client(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+            except (OSError, EOFError) as e:
+                raise PoolUnavailableError(f"Classifier pool is unavailable: {e}")
+            self._local.connection = connection
+        return connection
+
+    def _reset(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--socket', default=os.getenv('CLASSIFIER_POOL_SOCKET', '/tmp/instahelp-classifier.sock'))
+    parser.add_argument('--processes', type=int, default=int(os.getenv('CLASSIFIER_POOL_PROCESSES', 2)))
+    parser.add_argument('--max-pending', type=int, default=int(os.getenv('CLASSIFIER_POOL_MAX_PENDING', 32)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ClassifierPoolServer(args.socket, processes=args.processes, max_pending=args.max_pending).serve_forever()
+
+if __name__ == '__main__':
+    main()
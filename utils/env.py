@@ -0,0 +1,17 @@
+import os
+
+def env_flag(name, default=False):
+    """
+    Membaca environment variable sebagai boolean.
+
+    Args:
+        name (str): Nama environment variable.
+        default (bool): Nilai jika variable tidak diisi.
+
+    Returns:
+        bool: True untuk '1', 'true', 'yes' atau 'on' (tidak case-sensitive).
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
@@ -0,0 +1,289 @@
+import io
+import os
+import uuid
+from datetime import timedelta
+
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from google.cloud import storage
+from google.oauth2 import service_account
+
+from utils.images import InvalidImageError, inspect_image, thumbnail_path
+from utils.storage import (
+    ALLOWED_IMAGE_TYPES, DIRECT_UPLOAD_DIRS, DIRECT_UPLOAD_FOLDER, DOWNLOAD_CHUNK_SIZE,
+    MAX_UPLOAD_SIZE, REFERENCES_KEY, SNIFF_SIZE, UPLOAD_CHUNK_SIZE, Storage,
+)
+
+# Jumlah referensi diubah dengan precondition metageneration agar aman dari
+# race condition; diulang jika objek diubah request lain di saat yang sama
+REFERENCE_RETRIES = 5
+
+# Masa berlaku signed URL untuk upload langsung (detik)
+SIGNED_URL_TTL = int(os.getenv('STORAGE_SIGNED_URL_TTL', 900))
+
+class GCSStorage(Storage):
+    def __init__(self):
+        # Pastikan path kredensial benar
+        status = os.environ.get("Environment")
+
+        if status == "production":
+            GOOGLE_APPLICATION_CREDENTIALS = service_account.Credentials.from_service_account_file(
+                "/SECRETS/SERVICE_ACCOUNT")
+        else:
+            GOOGLE_APPLICATION_CREDENTIALS = service_account.Credentials.from_service_account_file(
+                os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"))
+
+        self.client = storage.Client(credentials=GOOGLE_APPLICATION_CREDENTIALS)
+        self.bucket = self.client.bucket(os.getenv('BUCKET_NAME'))
+
+    def getFile(self, filepath):
+        return self.bucket.blob(filepath)
+
+    def getBlob(self, filepath):
+        """
+        Fetch an object's metadata in a single request
+
+        :return: Blob with size, content type, generation and hashes, or None if missing
+        """
+        return self.bucket.get_blob(filepath)
+
+    def openBlob(self, blob):
+        """
+        Open a blob returned by getBlob for streaming, seekable reads
+
+        Reads are pinned to the blob's generation, so a concurrent overwrite
+        fails the download instead of mixing two versions.
+
+        :return: Binary file object fetching DOWNLOAD_CHUNK_SIZE bytes per request
+        """
+        return blob.open('rb', chunk_size=DOWNLOAD_CHUNK_SIZE, if_generation_match=blob.generation)
+
+    def deleteFile(self, filepath):
+        """
+        Release one reference to a file; the blob is only deleted with its last reference
+
+        :param filepath: Path returned by uploadFile/uploadBinary
+        :return: True if the reference was released
+        """
+        try:
+            blob = self.bucket.blob(filepath)
+            for _ in range(REFERENCE_RETRIES):
+                blob.reload()
+                references = self._references(blob)
+                if references > 1:
+                    if self._setReferences(blob, references - 1):
+                        return True
+                    continue
+
+                try:
+                    blob.delete(if_metageneration_match=blob.metageneration)
+                except PreconditionFailed:
+                    # Ada upload lain yang menambah referensi; hitung ulang
+                    continue
+
+                # Hapus thumbnail milik gambar yang sudah dinormalisasi
+                thumbnail = thumbnail_path(filepath)
+                if thumbnail != filepath:
+                    try:
+                        self.bucket.blob(thumbnail).delete()
+                    except NotFound:
+                        pass
+                return True
+
+            raise RuntimeError(f"References of {filepath} kept changing.")
+        except Exception as e:
+            print(f"Error deleting file: {e}")
+            return False
+
+    def fileExists(self, filepath):
+        return self.bucket.blob(filepath).exists()
+
+    def listFiles(self, prefix):
+        """
+        List the objects under a prefix, paging through the bucket listing
+
+        :return: Iterator of Blobs with name, updated and metageneration
+        """
+        return self.client.list_blobs(self.bucket, prefix=prefix)
+
+    def deleteFiles(self, blobs):
+        """
+        Delete listed objects in one batch request (at most 100 objects)
+
+        Each delete is conditional on the metageneration seen when listing, so
+        an object that gained a reference since then is kept.
+
+        :param blobs: Blobs returned by listFiles
+        :return: Number of objects deleted; failed ones are left for the next run
+        """
+        try:
+            with self.client.batch(raise_exception=False) as batch:
+                for blob in blobs:
+                    blob.delete(if_metageneration_match=blob.metageneration)
+        except Exception as e:
+            print(f"Error deleting files: {e}")
+            return 0
+        # Satu respons per objek; precondition gagal atau 404 tidak dihitung.
+        # Batch tidak punya API publik untuk hasil per request, karena itu
+        # google-cloud-storage dikunci ke versi yang sudah dicek di requirements.txt
+        return sum(1 for response in batch._responses if 200 <= response.status_code < 300)
+
+    def ensureReferences(self, blob, references):
+        """
+        Raise an object's reference count to at least the given number
+
+        :param blob: Blob returned by listFiles
+        :param references: Number of references recorded in the database
+        :return: True if the count was raised
+        """
+        for _ in range(REFERENCE_RETRIES):
+            if self._references(blob) >= references:
+                return False
+            if self._setReferences(blob, references):
+                return True
+            try:
+                blob.reload()
+            except NotFound:
+                return False
+        print(f"Error repairing references: references of {blob.name} kept changing.")
+        return False
+
+    def createUploadUrl(self, dir, content_type, owner):
+        """
+        Issue a short-lived signed URL for uploading one image straight to the bucket
+
+        The URL can only create the object, not overwrite it once uploaded.
+
+        :param dir: One of DIRECT_UPLOAD_DIRS
+        :param content_type: One of ALLOWED_IMAGE_TYPES
+        :param owner: ID of the user the upload is issued to; only this user
+                      can submit the path to verifyUpload
+        :return: Dict with the URL, the HTTP method and headers the client
+                 must send, the object path to submit afterwards and the TTL
+        :raises ValueError: If dir or content_type is not allowed
+        """
+        if dir not in DIRECT_UPLOAD_DIRS:
+            raise ValueError(f"Direktori harus salah satu dari: {', '.join(DIRECT_UPLOAD_DIRS)}.")
+        if content_type not in ALLOWED_IMAGE_TYPES:
+            raise ValueError(f"Tipe gambar harus salah satu dari: {', '.join(ALLOWED_IMAGE_TYPES)}.")
+
+        path = f'{self._directUploadPrefix(dir, owner)}{uuid.uuid4().hex}.{ALLOWED_IMAGE_TYPES[content_type]}'
+        # GCS menolak upload yang ukurannya di luar rentang ini, dan (dengan
+        # if-generation-match 0) PUT kedua ke path yang sama setelah objek ada
+        headers = {
+            'x-goog-content-length-range': f'0,{MAX_UPLOAD_SIZE}',
+            'x-goog-if-generation-match': '0',
+        }
+        url = self.bucket.blob(path).generate_signed_url(
+            version='v4',
+            expiration=timedelta(seconds=SIGNED_URL_TTL),
+            method='PUT',
+            content_type=content_type,
+            headers=headers,
+        )
+        return {
+            'url': url,
+            'method': 'PUT',
+            'headers': {'Content-Type': content_type, **headers},
+            'path': path,
+            'expires_in': SIGNED_URL_TTL,
+        }
+
+    def verifyUpload(self, path, dir, owner):
+        """
+        Check an object uploaded through createUploadUrl and add a reference to it
+
+        Reads the object's metadata and only its first bytes for type detection.
+        A path is accepted only once; the accepted path must be released with
+        deleteFile, like the paths returned by uploadFile/uploadBinary.
+
+        :param path: Object path returned by createUploadUrl
+        :param dir: Directory the object must belong to
+        :param owner: ID of the user submitting the path
+        :return: The verified path
+        :raises ValueError: If the path was issued to another user or already
+                            accepted, or the object is missing, too large or
+                            not an allowed image
+        """
+        prefix = self._directUploadPrefix(dir, owner)
+        name = path[len(prefix):] if path.startswith(prefix) else ''
+        if not name or '/' in name or '..' in name:
+            raise ValueError("Path gambar tidak valid.")
+
+        blob = self.bucket.get_blob(path)
+        if blob is None:
+            raise ValueError("Gambar belum diupload.")
+        if REFERENCES_KEY in (blob.metadata or {}):
+            raise ValueError("Gambar sudah dipakai.")
+        if blob.size > MAX_UPLOAD_SIZE:
+            raise ValueError(f"Ukuran gambar tidak boleh lebih dari {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+
+        header = blob.download_as_bytes(start=0, end=SNIFF_SIZE - 1, if_generation_match=blob.generation)
+        try:
+            mime = inspect_image(io.BytesIO(header)).mime
+        except InvalidImageError:
+            mime = None
+        if mime not in ALLOWED_IMAGE_TYPES or mime != blob.content_type:
+            raise ValueError("Tipe gambar tidak valid.")
+
+        # Referensi pertama diset dengan precondition metageneration; gagal
+        # berarti path yang sama sedang diterima oleh request lain
+        if not self._setReferences(blob, 1):
+            raise ValueError("Gambar sudah dipakai.")
+
+        # Set file menjadi publik seperti file yang diupload lewat API
+        blob.make_public()
+        return path
+
+    def _storeOnce(self, path, files):
+        blob = self.bucket.blob(path)
+        for _ in range(REFERENCE_RETRIES):
+            try:
+                blob.reload()
+            except NotFound:
+                try:
+                    self._uploadFiles(blob, files())
+                    return path
+                except PreconditionFailed:
+                    # Diupload bersamaan oleh request lain; tambahkan referensi
+                    continue
+
+            if self._setReferences(blob, self._references(blob) + 1):
+                return path
+
+        raise RuntimeError(f"References of {path} kept changing.")
+
+    def _uploadFiles(self, blob, files):
+        for path, content, content_type in files:
+            target = self.bucket.blob(path)
+            options = {}
+            if path == blob.name:
+                # Objek utama membawa jumlah referensi; gagal jika sudah ada
+                target = blob
+                target.metadata = {REFERENCES_KEY: '1'}
+                options['if_generation_match'] = 0
+
+            # ACL publik diset saat upload, tanpa request make_public terpisah
+            if isinstance(content, bytes):
+                target.upload_from_string(content, content_type=content_type, predefined_acl='publicRead', **options)
+            else:
+                # Ukuran diberikan langsung; stream diulang dari awal jika upload dicoba lagi
+                size = content.seek(0, io.SEEK_END)
+                content.seek(0)
+                target.chunk_size = UPLOAD_CHUNK_SIZE
+                target.upload_from_file(content, size=size, content_type=content_type, predefined_acl='publicRead', **options)
+
+    def _directUploadPrefix(self, dir, owner):
+        # Path upload langsung memuat ID pemiliknya, diperiksa saat verifikasi
+        return f'{dir}/{DIRECT_UPLOAD_FOLDER}/{owner}/'
+
+    def _references(self, blob):
+        # Objek lama tanpa metadata dianggap punya satu pemakai
+        return int((blob.metadata or {}).get(REFERENCES_KEY, 1))
+
+    def _setReferences(self, blob, references):
+        blob.metadata = {REFERENCES_KEY: str(references)}
+        try:
+            blob.patch(if_metageneration_match=blob.metageneration)
+            return True
+        except (PreconditionFailed, NotFound):
+            return False
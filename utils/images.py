@@ -0,0 +1,216 @@
+import io
+import os
+from collections import namedtuple
+
+import magic
+from PIL import Image, ImageOps
+
+# Batas sisi terpanjang gambar utama dan thumbnail (px), serta kualitas WebP
+IMAGE_MAX_SIZE = int(os.getenv('IMAGE_MAX_SIZE', 1600))
+IMAGE_THUMBNAIL_SIZE = int(os.getenv('IMAGE_THUMBNAIL_SIZE', 320))
+IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+
+# Thumbnail disimpan di samping gambar utama: <nama>.webp -> <nama>_thumb.webp
+NORMALIZED_EXTENSION = '.webp'
+THUMBNAIL_SUFFIX = '_thumb'
+
+# Jumlah byte awal yang dibaca untuk mengenali tipe file
+SNIFF_SIZE = 2048
+
+# Tipe gambar yang diterima beserta ekstensinya; tipe lain (mis. SVG yang bisa
+# berisi script) ditolak meski dikenali libmagic sebagai gambar
+ALLOWED_IMAGE_TYPES = {
+    'image/jpeg': 'jpeg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+}
+
+# Batas jumlah piksel sebelum gambar di-decode (melindungi dari decompression bomb)
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 50_000_000))
+
+# Tipe dan dimensi gambar yang dibaca dari header; width/height None jika tidak ditemukan
+ImageInfo = namedtuple('ImageInfo', ['mime', 'extension', 'width', 'height'])
+
+class ImageNormalizationError(ValueError):
+    """Raised when Pillow cannot read or convert an uploaded image"""
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not an image or is too large to decode"""
+
+def inspect_image(stream):
+    """
+    Identify an image and its dimensions from its header, without decoding it
+
+    PNG, GIF and WebP dimensions are in the first bytes. For JPEG the segments
+    before the frame header are skipped (seeked over when the stream allows it)
+    rather than read. Headers not parsed here fall back to libmagic on the
+    first SNIFF_SIZE bytes. The position of a seekable stream is restored.
+
+    :param stream: Binary stream positioned at the start of the file
+    :return: ImageInfo
+    :raises InvalidImageError: If the file is not one of ALLOWED_IMAGE_TYPES
+                               or has more than IMAGE_MAX_PIXELS pixels
+    """
+    seekable = stream.seekable() if hasattr(stream, 'seekable') else hasattr(stream, 'seek')
+    position = stream.tell() if seekable else None
+    try:
+        header = stream.read(SNIFF_SIZE)
+        info = _inspect_header(header, stream, seekable)
+    finally:
+        if seekable:
+            stream.seek(position)
+
+    if info is None:
+        mime = magic.from_buffer(header, mime=True)
+        if mime not in ALLOWED_IMAGE_TYPES:
+            raise InvalidImageError(f"Not an allowed image type: {mime}")
+        info = ImageInfo(mime, ALLOWED_IMAGE_TYPES[mime], None, None)
+
+    if info.width and info.height and info.width * info.height > IMAGE_MAX_PIXELS:
+        raise InvalidImageError(f"Image has too many pixels: {info.width}x{info.height}")
+    return info
+
+def _inspect_header(header, stream, seekable):
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return ImageInfo('image/png', 'png', *_unpack(header, 16, 4, 'big', 2))
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return ImageInfo('image/gif', 'gif', *_unpack(header, 6, 2, 'little', 2))
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return ImageInfo('image/webp', 'webp', *_webp_size(header))
+    if header.startswith(b'\xff\xd8\xff'):
+        return ImageInfo('image/jpeg', 'jpeg', *_jpeg_size(header, stream, seekable))
+    return None
+
+def _unpack(data, offset, size, byteorder, count):
+    if len(data) < offset + size * count:
+        return (None,) * count
+    return tuple(
+        int.from_bytes(data[offset + i * size:offset + (i + 1) * size], byteorder)
+        for i in range(count)
+    )
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = _unpack(header, 26, 2, 'little', 2)
+        return width & 0x3fff, height & 0x3fff
+    if chunk == b'VP8L' and len(header) >= 25:
+        b0, b1, b2, b3 = header[21:25]
+        return 1 + (((b1 & 0x3f) << 8) | b0), 1 + (((b3 & 0x0f) << 10) | (b2 << 2) | (b1 >> 6))
+    if chunk == b'VP8X' and len(header) >= 30:
+        width, height = _unpack(header, 24, 3, 'little', 2)
+        return width + 1, height + 1
+    return None, None
+
+# Marker JPEG yang berisi dimensi gambar (SOF0-SOF15 kecuali DHT, JPG dan DAC)
+_JPEG_FRAME_MARKERS = set(range(0xc0, 0xd0)) - {0xc4, 0xc8, 0xcc}
+
+def _jpeg_size(header, stream, seekable):
+    # Segmen dibaca dari header, lalu dilanjutkan dari stream jika header habis
+    data = header
+    offset = 2
+    for _ in range(256):
+        while len(data) < offset + 9:
+            more = stream.read(SNIFF_SIZE)
+            if not more:
+                return None, None
+            data = data[offset:] + more
+            offset = 0
+
+        if data[offset] != 0xff:
+            return None, None
+        marker = data[offset + 1]
+        if marker == 0xff:
+            # Byte pengisi sebelum marker
+            offset += 1
+            continue
+        if marker == 0x01 or 0xd0 <= marker <= 0xd8:
+            offset += 2
+            continue
+
+        length = int.from_bytes(data[offset + 2:offset + 4], 'big')
+        if marker in _JPEG_FRAME_MARKERS:
+            height, width = _unpack(data, offset + 5, 2, 'big', 2)
+            return width, height
+        if marker in (0xd9, 0xda):
+            return None, None
+
+        # Lewati isi segmen (mis. EXIF/APP1 berukuran puluhan KB) tanpa membacanya
+        offset += 2 + length
+        if offset > len(data):
+            skip = offset - len(data)
+            if seekable:
+                stream.seek(skip, io.SEEK_CUR)
+            else:
+                while skip > 0:
+                    chunk = stream.read(min(skip, SNIFF_SIZE))
+                    if not chunk:
+                        return None, None
+                    skip -= len(chunk)
+            data = b''
+            offset = 0
+    return None, None
+
+def normalize_image(file):
+    """
+    Resize and recompress an uploaded image into WebP variants
+
+    :param file: Seekable binary file holding the original image
+    :return: Dict of filename suffix -> WebP bytes: '' for the main image
+             (longest side at most IMAGE_MAX_SIZE) and THUMBNAIL_SUFFIX for
+             the thumbnail (at most IMAGE_THUMBNAIL_SIZE)
+    :raises ImageNormalizationError: If the image cannot be decoded
+    """
+    try:
+        with Image.open(file) as original:
+            # JPEG langsung di-decode pada skala kecil; format lain diabaikan
+            original.draft('RGB', (IMAGE_MAX_SIZE, IMAGE_MAX_SIZE))
+
+            # Terapkan orientasi EXIF karena metadata tidak ikut disimpan
+            image = ImageOps.exif_transpose(original)
+            has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        image.thumbnail((IMAGE_MAX_SIZE, IMAGE_MAX_SIZE), Image.LANCZOS)
+        variants = {'': _encode(image)}
+
+        image.thumbnail((IMAGE_THUMBNAIL_SIZE, IMAGE_THUMBNAIL_SIZE), Image.LANCZOS)
+        variants[THUMBNAIL_SUFFIX] = _encode(image)
+        return variants
+
+    except Exception as e:
+        raise ImageNormalizationError(str(e)) from e
+
+def _encode(image):
+    output = io.BytesIO()
+    image.save(output, 'WEBP', quality=IMAGE_QUALITY, method=4)
+    return output.getvalue()
+
+def is_content_addressed(path):
+    """
+    Whether a stored path is named after the SHA-256 of its content
+
+    Such objects (and their thumbnails) never change once written.
+
+    :param path: Stored path, e.g. 'vehicles/<sha256>.webp'
+    :return: True for hash-named objects, False for older random names and
+             direct uploads
+    """
+    name = os.path.splitext(path.rsplit('/', 1)[-1])[0]
+    if name.endswith(THUMBNAIL_SUFFIX):
+        name = name[:-len(THUMBNAIL_SUFFIX)]
+    return len(name) == 64 and not name.strip('0123456789abcdef')
+
+def thumbnail_path(path):
+    """
+    Path of the thumbnail stored next to a normalized image
+
+    :param path: Stored image path, e.g. 'vehicles/<sha256>.webp'
+    :return: Thumbnail path, or the path itself for images without a
+             thumbnail (stored before normalization or uploaded directly)
+    """
+    # Hanya gambar hasil normalisasi yang dinamai dengan hash SHA-256
+    if not path or not path.endswith(NORMALIZED_EXTENSION) or not is_content_addressed(path):
+        return path
+    return path[:-len(NORMALIZED_EXTENSION)] + THUMBNAIL_SUFFIX + NORMALIZED_EXTENSION
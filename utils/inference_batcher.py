@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    def __init__(self, predict_batch, max_batch_size=16, max_wait_ms=5):
+        """
+        Collect concurrent predictions into small batches for one forward pass
+
+        :param predict_batch: Callable that takes a list of texts and returns one result per text
+        :param max_batch_size: Maximum number of texts per forward pass
+        :param max_wait_ms: Maximum time (ms) the first text in a batch waits for companions
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, text):
+        """
+        Queue a text for classification
+
+        :param text: Input text to classify
+        :return: Future resolving to the text's result
+        """
+        if not text.strip():
+            raise ValueError("Input text is empty.")
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text, timeout=None):
+        """
+        Classify a text, blocking until its batch has been processed
+
+        :param text: Input text to classify
+        :param timeout: Maximum number of seconds to wait, or None to wait forever
+        :return: The text's result from predict_batch
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    def _ensure_started(self):
+        # Thread dibuat saat pemakaian pertama agar aman terhadap fork gunicorn
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='classifier-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+
+            try:
+                labels = self.predict_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), label in zip(batch, labels):
+                future.set_result(label)
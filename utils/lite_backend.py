@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+LITE_MODEL_FILE = 'emergency_case_model.tflite'
+VOCABULARY_FILE = 'vocabulary.json'
+
+def export_lite_model(model_dir, max_sequence_length, quantize=False):
+    """
+    Export the Keras model, tokenizer and label encoder of a model directory
+    for the lite backend
+
+    Writes emergency_case_model.tflite and vocabulary.json next to the .h5
+    file. Requires the full TensorFlow runtime; serving them does not.
+
+    :param model_dir: Directory holding emergency_case_model.h5 and the pickles
+    :param max_sequence_length: Padded sequence length the model expects
+    :param quantize: Store weights as int8 (dynamic range quantization)
+    :return: Path of the exported .tflite file
+    """
+    import pickle
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(os.path.join(model_dir, 'emergency_case_model.h5'))
+
+    @tf.function(input_signature=[
+        tf.TensorSpec(shape=(None, max_sequence_length), dtype=tf.int32)
+    ])
+    def infer(sequences):
+        return model(sequences, training=False)
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([infer.get_concrete_function()], model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    lite_path = os.path.join(model_dir, LITE_MODEL_FILE)
+    with open(lite_path, 'wb') as handle:
+        handle.write(converter.convert())
+
+    with open(os.path.join(model_dir, 'tokenizer.pickle'), 'rb') as handle:
+        tokenizer = pickle.load(handle)
+    with open(os.path.join(model_dir, 'label_encoder.pickle'), 'rb') as handle:
+        label_encoder = pickle.load(handle)
+
+    # Kata dengan indeks >= num_words diperlakukan Keras sama seperti kata asing
+    word_index = {
+        word: index for word, index in tokenizer.word_index.items()
+        if not tokenizer.num_words or index < tokenizer.num_words
+    }
+    vocabulary = {
+        'word_index': word_index,
+        'oov_index': tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token else None,
+        'lower': tokenizer.lower,
+        'max_sequence_length': max_sequence_length,
+        'classes': [str(label) for label in label_encoder.classes_],
+    }
+    with open(os.path.join(model_dir, VOCABULARY_FILE), 'w') as handle:
+        json.dump(vocabulary, handle)
+
+    return lite_path
+
+def _load_interpreter(model_path):
+    # Utamakan tflite-runtime yang ringan; jatuh ke tf.lite jika tidak terpasang
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=int(os.getenv('CLASSIFIER_LITE_THREADS', 1)))
+
+class LiteVocabulary:
+    def __init__(self, path):
+        """
+        Tokenizer vocabulary and label classes exported by export_lite_model
+
+        :param path: Path of vocabulary.json
+        """
+        with open(path) as handle:
+            vocabulary = json.load(handle)
+
+        self.word_index = vocabulary['word_index']
+        self.oov_index = vocabulary['oov_index']
+        self.lower = vocabulary['lower']
+        self.classes = np.array(vocabulary['classes'])
+
+    def inverse_transform(self, indices):
+        return self.classes[indices]
+
+class LiteModel:
+    def __init__(self, model_path):
+        """
+        Run an exported .tflite classifier with the TFLite interpreter
+
+        :param model_path: Path of emergency_case_model.tflite
+        """
+        self.interpreter = _load_interpreter(model_path)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]['index']
+        self._output = self.interpreter.get_output_details()[0]['index']
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def __call__(self, padded):
+        """
+        :param padded: int32 array of shape (batch, max_sequence_length)
+        :return: Softmax output as a NumPy array
+        """
+        # Interpreter tidak thread-safe dan ukuran input harus disesuaikan per batch
+        with self._lock:
+            if padded.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input, padded.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = padded.shape[0]
+
+            self.interpreter.set_tensor(self._input, padded)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output).copy()
@@ -0,0 +1,327 @@
+import fcntl
+import io
+import json
+import mimetypes
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.images import thumbnail_path
+from utils.storage import REFERENCES_KEY, Storage
+
+# Metadata (tipe konten dan jumlah referensi) disimpan terpisah di <root>/.meta
+META_DIR = '.meta'
+LOCK_FILE = '.lock'
+# Awalan file sementara upload yang belum dipindahkan ke path akhirnya
+TEMP_PREFIX = '.upload-'
+
+# Pengganti Blob GCS untuk proxy /storage; references seperti tersimpan di metadata
+LocalObject = namedtuple('LocalObject', ['name', 'path', 'size', 'content_type', 'generation', 'md5_hash', 'updated', 'references'])
+
+class LocalStorage(Storage):
+    def __init__(self, root, mmap_reads=False):
+        """
+        Storage backend keeping objects as files on local disk
+
+        Reference counts are updated under an exclusive file lock, so several
+        gunicorn workers may share one directory.
+
+        :param root: Directory holding the objects, created if missing
+        :param mmap_reads: Serve reads from memory-mapped files
+        """
+        self.root = os.path.abspath(root)
+        self.mmap_reads = mmap_reads
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, META_DIR), exist_ok=True)
+
+    def getBlob(self, filepath):
+        """
+        Stat a stored file
+
+        :return: LocalObject, or None if missing
+        """
+        path = self._resolve(filepath)
+        if not path or not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        meta = self._readMeta(filepath)
+        return LocalObject(
+            name=filepath,
+            path=path,
+            size=stat.st_size,
+            content_type=meta.get('content_type') or mimetypes.guess_type(path)[0],
+            generation=stat.st_mtime_ns,
+            md5_hash=None,
+            updated=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            references=meta.get(REFERENCES_KEY),
+        )
+
+    def openBlob(self, obj):
+        """
+        Open a LocalObject returned by getBlob for streaming, seekable reads
+
+        :return: Binary file object
+        """
+        file = open(obj.path, 'rb')
+        if not self.mmap_reads or not obj.size:
+            return file
+        return _MappedFile(file)
+
+    def deleteFile(self, filepath):
+        """
+        Release one reference to a file; the file is only deleted with its last reference
+
+        :param filepath: Path returned by uploadFile/uploadBinary
+        :return: True if the reference was released
+        """
+        try:
+            path = self._resolve(filepath)
+            if not path:
+                raise ValueError(f"Invalid path: {filepath}")
+
+            with self._locked():
+                meta = self._readMeta(filepath)
+                references = int(meta.get(REFERENCES_KEY, 1))
+                if references > 1:
+                    meta[REFERENCES_KEY] = str(references - 1)
+                    self._writeMeta(filepath, meta)
+                    return True
+
+                os.remove(path)
+                self._removeMeta(filepath)
+
+                # Hapus thumbnail milik gambar yang sudah dinormalisasi
+                thumbnail = thumbnail_path(filepath)
+                if thumbnail != filepath:
+                    self._removeFile(thumbnail)
+                return True
+        except Exception as e:
+            print(f"Error deleting file: {e}")
+            return False
+
+    def fileExists(self, filepath):
+        path = self._resolve(filepath)
+        return bool(path) and os.path.isfile(path)
+
+    def listFiles(self, prefix):
+        """
+        List the files under a prefix
+
+        :return: Iterator of LocalObjects
+        """
+        directory = self._resolve(prefix)
+        if not directory:
+            return
+        for current, _, names in os.walk(directory):
+            for name in sorted(names):
+                if name.startswith(TEMP_PREFIX):
+                    continue
+                obj = self.getBlob(os.path.relpath(os.path.join(current, name), self.root))
+                if obj:
+                    yield obj
+
+    def deleteFiles(self, objects):
+        """
+        Delete listed files
+
+        Files rewritten or re-referenced since listing are skipped, like the
+        generation preconditions of the GCS backend.
+
+        :param objects: LocalObjects returned by listFiles
+        :return: Number of files deleted
+        """
+        deleted = 0
+        with self._locked():
+            for obj in objects:
+                # Baca ulang di bawah lock; file yang berubah sejak listing tidak dihapus
+                current = self.getBlob(obj.name)
+                if not current or current.generation != obj.generation or current.references != obj.references:
+                    continue
+                try:
+                    os.remove(obj.path)
+                    deleted += 1
+                except OSError:
+                    continue
+                self._removeMeta(obj.name)
+        return deleted
+
+    def ensureReferences(self, obj, references):
+        """
+        Raise a file's reference count to at least the given number
+
+        :param obj: LocalObject returned by listFiles
+        :param references: Number of references recorded in the database
+        :return: True if the count was raised
+        """
+        with self._locked():
+            if not self.fileExists(obj.name):
+                return False
+            meta = self._readMeta(obj.name)
+            if int(meta.get(REFERENCES_KEY, 1)) >= references:
+                return False
+            meta[REFERENCES_KEY] = str(references)
+            self._writeMeta(obj.name, meta)
+            return True
+
+    def createUploadUrl(self, dir, content_type, owner):
+        raise ValueError("Upload langsung hanya tersedia untuk penyimpanan GCS.")
+
+    def verifyUpload(self, path, dir, owner):
+        raise ValueError("Upload langsung hanya tersedia untuk penyimpanan GCS.")
+
+    def _storeOnce(self, path, files):
+        with self._locked():
+            if self._addReference(path):
+                return path
+
+        # Normalisasi dan penulisan file sementara dilakukan di luar lock agar
+        # upload lain (dan hapus referensi) tidak menunggu encode gambar
+        staged = []
+        try:
+            for file_path, content, content_type in files():
+                staged.append((file_path, self._stageFile(file_path, content), content_type))
+
+            with self._locked():
+                # Diupload bersamaan oleh request lain; tambahkan referensi saja
+                if self._addReference(path):
+                    return path
+
+                # Objek utama dipindahkan terakhir seperti di GCS
+                for file_path, temp_path, content_type in staged:
+                    os.replace(temp_path, self._resolve(file_path))
+                    meta = {'content_type': content_type}
+                    if file_path == path:
+                        meta[REFERENCES_KEY] = '1'
+                    self._writeMeta(file_path, meta)
+                return path
+        finally:
+            # Hapus file sementara yang tidak jadi dipakai
+            for _, temp_path, _ in staged:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def _addReference(self, path):
+        # Dipanggil dalam lock; False jika objek belum ada
+        if not self.fileExists(path):
+            return False
+        meta = self._readMeta(path)
+        meta[REFERENCES_KEY] = str(int(meta.get(REFERENCES_KEY, 1)) + 1)
+        self._writeMeta(path, meta)
+        return True
+
+    def _stageFile(self, filepath, content):
+        path = self._resolve(filepath)
+        if not path:
+            raise ValueError(f"Invalid path: {filepath}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Tulis ke file sementara di direktori tujuan; rename nanti atomik
+        # sehingga pembaca tidak pernah melihat file setengah jadi
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=TEMP_PREFIX, delete=False) as output:
+            if isinstance(content, bytes):
+                output.write(content)
+            else:
+                shutil.copyfileobj(content, output)
+        return output.name
+
+    def _removeFile(self, filepath):
+        path = self._resolve(filepath)
+        try:
+            os.remove(path)
+        except (OSError, TypeError):
+            pass
+        self._removeMeta(filepath)
+
+    def _readMeta(self, filepath):
+        try:
+            with open(self._metaPath(filepath)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _writeMeta(self, filepath, meta):
+        path = self._metaPath(filepath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    def _removeMeta(self, filepath):
+        try:
+            os.remove(self._metaPath(filepath))
+        except OSError:
+            pass
+
+    def _metaPath(self, filepath):
+        return os.path.join(self.root, META_DIR, filepath + '.json')
+
+    def _resolve(self, filepath):
+        # Tolak path yang keluar dari root atau menyentuh direktori internal
+        path = os.path.normpath(os.path.join(self.root, filepath))
+        if not path.startswith(self.root + os.sep):
+            return None
+        if os.path.relpath(path, self.root).split(os.sep)[0] in (META_DIR, LOCK_FILE):
+            return None
+        return path
+
+    @contextmanager
+    def _locked(self):
+        # flock mengunci antar proses; lock thread menjaga worker dengan banyak thread
+        with self._thread_lock, open(os.path.join(self.root, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+class _MappedFile(io.RawIOBase):
+    def __init__(self, file):
+        """
+        Seekable reader over a memory-mapped file
+
+        Reads copy straight from the page cache without a read() system call.
+
+        :param file: Open binary file of non-zero size, closed with the reader
+        """
+        self._file = file
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = max(0, min(len(buffer), len(self._map) - self._position))
+        # Salin langsung dari mapping tanpa objek bytes perantara
+        with memoryview(self._map) as view:
+            buffer[:size] = view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._map)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
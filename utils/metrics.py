@@ -0,0 +1,98 @@
+import threading
+import time
+from bisect import bisect_left
+
+from utils.env import env_flag
+
+# Metrik aktif jika CLASSIFIER_METRICS=true; jika tidak, timer berupa no-op
+METRICS_ENABLED = env_flag('CLASSIFIER_METRICS')
+
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+class Histogram:
+    def __init__(self, name, documentation, label_name, buckets=DEFAULT_BUCKETS):
+        """
+        Cumulative histogram rendered in the Prometheus text format
+
+        :param name: Metric name
+        :param documentation: HELP text
+        :param label_name: Name of the single label distinguishing series
+        :param buckets: Sorted upper bounds in seconds; +Inf is implicit
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), series['counts']):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{self.label_name}="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_sum{{{self.label_name}="{label}"}} {series["sum"]}')
+                lines.append(f'{self.name}_count{{{self.label_name}="{label}"}} {series["count"]}')
+        return '\n'.join(lines) + '\n'
+
+classifier_stage_seconds = Histogram(
+    'classifier_stage_seconds',
+    'Time spent in each stage of emergency case classification.',
+    'stage',
+)
+
+class _StageTimer:
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        classifier_stage_seconds.observe(self.stage, time.perf_counter() - self.started)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+def classifier_stage(stage):
+    """
+    Context manager timing one classifier stage into classifier_stage_seconds
+
+    :param stage: Stage name, e.g. 'tokenize' or 'forward'
+    :return: A timer, or a shared no-op when metrics are disabled
+    """
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _StageTimer(stage)
+
+def render_metrics():
+    """
+    :return: All metrics in the Prometheus text exposition format
+    """
+    return classifier_stage_seconds.render()
@@ -0,0 +1,73 @@
+import os
+
+# Nama versi untuk model bawaan di utils/models/
+BUNDLED_VERSION = 'bundled'
+
+class ModelRegistry:
+    def __init__(self, root):
+        """
+        Versioned classifier models stored as <root>/<version>/
+
+        Each version directory holds emergency_case_model.h5, tokenizer.pickle
+        and label_encoder.pickle. The active version is recorded in
+        <root>/ACTIVE, which every worker process watches.
+
+        :param root: Directory containing one sub-directory per model version
+        """
+        self.root = root
+        self.active_file = os.path.join(root, 'ACTIVE')
+
+    def versions(self):
+        """
+        :return: Sorted list of available model versions
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def path_for(self, version):
+        """
+        :param version: Model version name
+        :return: Directory holding the files of that version
+        """
+        return os.path.join(self.root, version)
+
+    def active_version(self):
+        """
+        :return: The version named in the ACTIVE file, or CLASSIFIER_MODEL_VERSION, or None
+        """
+        try:
+            with open(self.active_file) as handle:
+                version = handle.read().strip()
+                if version:
+                    return version
+        except FileNotFoundError:
+            pass
+        return os.getenv('CLASSIFIER_MODEL_VERSION') or None
+
+    def activate(self, version):
+        """
+        Make a version active for all workers watching this registry
+
+        :param version: Model version name
+        """
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+
+        # Tulis ke file sementara lalu rename agar worker tidak membaca file setengah jadi
+        tmp_path = f'{self.active_file}.tmp'
+        with open(tmp_path, 'w') as handle:
+            handle.write(version)
+        os.replace(tmp_path, self.active_file)
+
+def get_registry():
+    """
+    :return: ModelRegistry for CLASSIFIER_MODELS_DIR, or None when not configured
+    """
+    root = os.getenv('CLASSIFIER_MODELS_DIR')
+    if not root:
+        return None
+    return ModelRegistry(root)
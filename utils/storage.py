@@ -1,81 +1,246 @@
+import binascii
+import hashlib
+import io
+import logging
 import os
-import base64
-import string
-import random
-import time
-import magic
-
-from google.cloud import storage
-from google.oauth2 import service_account
-
-class Storage:
-    def __init__(self):
-        # Pastikan path kredensial benar
-        status = os.environ.get("Environment")
-
-        if status == "production":
-            GOOGLE_APPLICATION_CREDENTIALS = service_account.Credentials.from_service_account_file(
-                "/SECRETS/SERVICE_ACCOUNT")
-        else:
-            GOOGLE_APPLICATION_CREDENTIALS = service_account.Credentials.from_service_account_file(
-                os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"))
-        
-        self.client = storage.Client(credentials=GOOGLE_APPLICATION_CREDENTIALS)
-        self.bucket = self.client.bucket(os.getenv('BUCKET_NAME'))
-
-    def getFile(self, filepath):
-        return self.bucket.blob(filepath)
+import tempfile
+import threading
+from abc import ABC, abstractmethod
 
+from utils.base64_stream import Base64Stream
+from utils.env import env_flag
+from utils.images import (
+    ALLOWED_IMAGE_TYPES, NORMALIZED_EXTENSION, SNIFF_SIZE, ImageNormalizationError, InvalidImageError, inspect_image,
+    normalize_image,
+)
+
+# Ukuran potongan upload resumable; GCS mensyaratkan kelipatan 256 KB
+_CHUNK_ALIGN = 256 * 1024
+UPLOAD_CHUNK_SIZE = max(1, int(os.getenv('STORAGE_UPLOAD_CHUNK_SIZE', 1024 * 1024)) // _CHUNK_ALIGN) * _CHUNK_ALIGN
+
+# Ukuran potongan saat objek di-stream keluar lewat proxy /storage
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('STORAGE_DOWNLOAD_CHUNK_SIZE', 1024 * 1024))
+
+# Simpan gambar sebagai WebP berukuran terbatas beserta thumbnail (default aktif)
+NORMALIZE_IMAGES = env_flag('STORAGE_NORMALIZE_IMAGES', True)
+
+# Objek dinamai dengan hash isinya; jumlah pemakai disimpan bersama objek
+REFERENCES_KEY = 'references'
+
+# Upload langsung ke bucket lewat signed URL: ukuran maksimal dan direktori
+# yang diizinkan (tipe gambar mengikuti ALLOWED_IMAGE_TYPES)
+MAX_UPLOAD_SIZE = int(os.getenv('STORAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+DIRECT_UPLOAD_DIRS = ('incidents', 'vehicles', 'avatars')
+DIRECT_UPLOAD_FOLDER = 'direct'
+
+_storage = None
+_lock = threading.Lock()
+
+def get_storage():
+    """
+    Storage backend selected by STORAGE_BACKEND, created on first use
+
+    'gcs' (default) stores objects in the BUCKET_NAME bucket. 'local' stores
+    them under STORAGE_LOCAL_DIR and needs no credentials or network, for
+    development and load testing.
+
+    :return: Storage backend instance shared by the process
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                _storage = _create_storage()
+    return _storage
+
+def _create_storage():
+    backend = os.getenv('STORAGE_BACKEND', 'gcs').strip().lower()
+    if backend == 'gcs':
+        from utils.gcs_storage import GCSStorage
+        return GCSStorage()
+    if backend == 'local':
+        from utils.local_storage import LocalStorage
+        root = os.getenv('STORAGE_LOCAL_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'storage')
+        return LocalStorage(root, mmap_reads=env_flag('STORAGE_LOCAL_MMAP'))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+class Storage(ABC):
+    """
+    Upload pipeline shared by the storage backends
+
+    Backends implement the abstract methods below.
+    """
+
+    @abstractmethod
+    def getBlob(self, filepath):
+        """
+        :return: Object with name, size, content_type, generation, md5_hash
+                 and updated, or None if missing
+        """
+
+    @abstractmethod
+    def openBlob(self, obj):
+        """
+        :param obj: Object returned by getBlob
+        :return: Seekable binary file object for streaming reads
+        """
+
+    @abstractmethod
     def deleteFile(self, filepath):
-        try:
-            blob = self.bucket.blob(filepath)
-            blob.delete()
-            return True
-        except Exception as e:
-            print(f"Error deleting file: {e}")
-            return False
+        """
+        Release one reference to a file; the file is only deleted with its last reference
+
+        :return: True if the reference was released
+        """
 
+    @abstractmethod
     def fileExists(self, filepath):
-        return self.bucket.blob(filepath).exists()
+        """
+        :return: True if the file exists
+        """
+
+    @abstractmethod
+    def listFiles(self, prefix):
+        """
+        :return: Iterator of objects under prefix, with name and updated
+        """
+
+    @abstractmethod
+    def deleteFiles(self, objects):
+        """
+        Delete objects returned by listFiles, regardless of their references
+
+        :return: Number of objects deleted
+        """
+
+    @abstractmethod
+    def ensureReferences(self, obj, references):
+        """
+        Raise the reference count of an object returned by listFiles to at
+        least the given number
+
+        :return: True if the count was raised
+        """
+
+    @abstractmethod
+    def createUploadUrl(self, dir, content_type, owner):
+        """
+        Issue a URL for uploading one image directly to the backend
+
+        :raises ValueError: If the backend has no direct uploads, or dir or
+                            content_type is not allowed
+        """
+
+    @abstractmethod
+    def verifyUpload(self, path, dir, owner):
+        """
+        Check a directly uploaded object and add a reference to it
+
+        :return: The verified path
+        :raises ValueError: If the object cannot be accepted
+        """
 
     def uploadFile(self, file_base64, dir=''):
+        """
+        :return: Path of the stored file, or None if storing it failed
+        :raises InvalidImageError: If the data is not valid base64 of an allowed image
+        """
+        try:
+            # Decode base64 per potongan agar gambar tidak pernah utuh di memori
+            stream = io.BufferedReader(Base64Stream(file_base64, UPLOAD_CHUNK_SIZE), UPLOAD_CHUNK_SIZE)
+            return self.uploadStream(stream, dir)
+
+        except InvalidImageError:
+            raise
+        except binascii.Error as e:
+            raise InvalidImageError(f"Invalid base64 data: {e}")
+        except Exception as e:
+            logging.error(f"Upload error: {e}")
+            return None
+
+    def uploadBinary(self, file, dir=''):
+        """
+        :return: Path of the stored file, or None if storing it failed
+        :raises InvalidImageError: If the file is not an allowed image
+        """
         try:
-            # Pisahkan prefix jika ada
-            if file_base64.startswith('data:image'):
-                file_base64 = file_base64.split(',')[1]
-            
-            # Konversi data base64 menjadi bytes
-            file_bytes = base64.b64decode(file_base64)
-            
-            # Dapatkan ekstensi file
-            ext = self._get_file_extension(file_bytes)
-            filename = self._generateFilename() + '.' + ext
-            
-            # Simpan file ke cloud
-            full_path = f'{dir}/{filename}'
-            blob = self.bucket.blob(full_path)
-            
-            # Upload dengan tipe konten yang sesuai
-            content_type = f'image/{ext}'
-            blob.upload_from_string(file_bytes, content_type=content_type)
-            
-            # Set file menjadi publik setelah diupload
-            blob.make_public()
-            
-            return full_path  # Kembalikan path file untuk disimpan di database
+            # File multipart langsung di-stream, tanpa base64
+            return self.uploadStream(file, dir)
 
+        except InvalidImageError:
+            raise
         except Exception as e:
-            print(f"Upload error: {e}")
+            logging.error(f"Upload error: {e}")
             return None
 
-    def _get_file_extension(self, file_data):
-        file_signature = magic.from_buffer(file_data, mime=True)
-        return file_signature.split('/')[1]
-    
-    def _generateFilename(self):
-        timestamp = str(int(time.time()))
-        random_chars = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-        return timestamp + '_' + random_chars
-
-# Buat instance global
-storage_manager = Storage()
\ No newline at end of file
+    def uploadStream(self, stream, dir=''):
+        """
+        Store a file stream under the hash of its content
+
+        A file that was uploaded before is not uploaded again; it only gains a
+        reference, so each stored path must be released with deleteFile once.
+
+        :param stream: Binary stream positioned at the start of the file; a
+                       stream that cannot seek (e.g. base64) is spooled first
+        :param dir: Target directory
+        :return: Path of the stored file
+        :raises InvalidImageError: If the file is not one of ALLOWED_IMAGE_TYPES
+        """
+        digest, stream = self._hashStream(stream)
+        # Tipe dan dimensi dibaca sekali dari header; dipakai untuk nama dan tipe konten
+        info = inspect_image(stream)
+        name = f'{dir}/{digest}'
+
+        if NORMALIZE_IMAGES:
+            try:
+                return self._storeOnce(name + NORMALIZED_EXTENSION, lambda: self._normalizedFiles(name, stream))
+            except ImageNormalizationError as e:
+                # Format yang tidak dikenali Pillow disimpan apa adanya
+                logging.warning(f"Image normalization failed, storing original: {e}")
+                stream.seek(0)
+
+        path = f'{name}.{info.extension}'
+        return self._storeOnce(path, lambda: [(path, stream, info.mime)])
+
+    @abstractmethod
+    def _storeOnce(self, path, files):
+        """
+        Store the files of a new object, or add a reference if path exists
+
+        :param path: Path of the reference-counted object
+        :param files: Callable returning (path, bytes or stream, content type)
+                      tuples, the object itself last; only called on upload
+        :return: path
+        """
+
+    def _normalizedFiles(self, name, stream):
+        variants = normalize_image(stream)
+        main = variants.pop('')
+
+        # Thumbnail disimpan lebih dulu agar sudah ada saat gambar utama terlihat
+        files = [
+            (name + suffix + NORMALIZED_EXTENSION, content, 'image/webp')
+            for suffix, content in variants.items()
+        ]
+        files.append((name + NORMALIZED_EXTENSION, main, 'image/webp'))
+        return files
+
+    def _hashStream(self, stream):
+        # Stream yang tidak bisa di-seek (base64) disalin ke file sementara
+        # (di memori hingga satu chunk) agar bisa dibaca ulang untuk upload;
+        # backend selalu menerima stream yang bisa seek dan tell
+        digest = hashlib.sha256()
+        # SpooledTemporaryFile (upload multipart) baru punya seekable() sejak Python 3.11
+        seekable = stream.seekable() if hasattr(stream, 'seekable') else hasattr(stream, 'seek')
+        if seekable:
+            for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+            stream.seek(0)
+            return digest.hexdigest(), stream
+
+        spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE)
+        for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            spool.write(chunk)
+        spool.seek(0)
+        return digest.hexdigest(), spool
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Cache disk untuk objek yang sering dibuka lewat proxy /storage.
+# STORAGE_CACHE_SIZE=0 menonaktifkan cache. Batas ukuran berlaku per proses
+# (tiap worker gunicorn mengelola indeksnya sendiri atas direktori yang sama).
+_cache = None
+_lock = threading.Lock()
+
+# File sementara yang tertinggal (proses mati saat menulis) dihapus setelah ini
+_STALE_TEMP_SECONDS = 3600
+
+def get_storage_cache():
+    """
+    Shared disk cache of the storage proxy
+
+    :return: DiskCache, or None if STORAGE_CACHE_SIZE is 0
+    """
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                max_bytes = int(os.getenv('STORAGE_CACHE_SIZE', 256 * 1024 * 1024))
+                _cache = DiskCache(
+                    os.getenv('STORAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'instahelp-storage-cache')),
+                    max_bytes=max_bytes,
+                    max_object_bytes=int(os.getenv('STORAGE_CACHE_MAX_OBJECT', 8 * 1024 * 1024)),
+                ) if max_bytes > 0 else False
+    return _cache or None
+
+def cache_key(path, generation=None):
+    """
+    Cache key of a stored object
+
+    :param path: Object path in the bucket
+    :param generation: Object generation; omit for content-addressed paths
+    """
+    name = path if generation is None else f'{path}#{generation}'
+    return hashlib.sha256(name.encode()).hexdigest()
+
+class DiskCache:
+    def __init__(self, directory, max_bytes, max_object_bytes):
+        """
+        Size-bounded least-recently-used cache of objects on local disk
+
+        Each entry is a <key>.bin file holding the content and a <key>.json
+        file holding its response metadata.
+
+        :param directory: Cache directory, created if missing
+        :param max_bytes: Total size kept before the oldest entries are evicted
+        :param max_object_bytes: Larger objects are streamed but not cached
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def get(self, key):
+        """
+        Open a cached object
+
+        :return: Tuple of (open binary file, metadata dict), or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(self._path(key, '.json')) as f:
+                meta = json.load(f)
+            return open(self._path(key, '.bin'), 'rb'), meta
+        except (OSError, ValueError):
+            # Dihapus oleh worker lain atau rusak
+            self._forget(key)
+            return None
+
+    def store(self, key, meta, chunks):
+        """
+        Wrap a response body so that it is cached while being sent
+
+        The entry is only added once every chunk was sent; an interrupted
+        response leaves the cache untouched.
+
+        :param key: Key from cache_key()
+        :param meta: JSON-serializable metadata returned again by get()
+        :param chunks: Iterable of the object's bytes, closed afterwards
+        :return: Iterable yielding the same chunks
+        """
+        if meta['size'] > self.max_object_bytes:
+            return chunks
+        return _CacheWriter(self, key, meta, chunks)
+
+    def discard(self, key):
+        """
+        Remove an entry, e.g. once its object was deleted from storage
+        """
+        self._forget(key)
+        _unlink(self._path(key, '.bin'))
+        _unlink(self._path(key, '.json'))
+
+    def _add(self, key, meta, temp_path):
+        try:
+            with open(self._path(key, '.json'), 'w') as f:
+                json.dump(meta, f)
+            os.replace(temp_path, self._path(key, '.bin'))
+        except OSError as e:
+            logging.warning(f"Failed to cache storage object: {e}")
+            _unlink(temp_path)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            self._entries[key] = meta['size']
+            self._size += meta['size']
+            self._evict()
+
+    def _forget(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            _unlink(self._path(key, '.bin'))
+            _unlink(self._path(key, '.json'))
+
+    def _scan(self):
+        # Pakai ulang isi cache dari proses sebelumnya, urut dari yang paling lama
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                if now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                    _unlink(path)
+            elif name.endswith('.bin'):
+                entries.append((stat.st_mtime, name[:-len('.bin')], stat.st_size))
+
+        with self._lock:
+            for _, key, size in sorted(entries):
+                self._entries[key] = size
+                self._size += size
+            self._evict()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+class _CacheWriter:
+    def __init__(self, cache, key, meta, chunks):
+        self._cache = cache
+        self._key = key
+        self._meta = meta
+        self._chunks = chunks
+        self._file = None
+
+    def __iter__(self):
+        try:
+            self._file = tempfile.NamedTemporaryFile(dir=self._cache.directory, suffix='.tmp', delete=False)
+        except OSError:
+            self._file = None
+
+        written = 0
+        for chunk in self._chunks:
+            if self._file:
+                try:
+                    self._file.write(chunk)
+                    written += len(chunk)
+                except OSError:
+                    # Disk penuh; response tetap dikirim tanpa cache
+                    self._discard()
+            yield chunk
+
+        if self._file:
+            self._file.close()
+            if written == self._meta['size']:
+                self._cache._add(self._key, self._meta, self._file.name)
+            else:
+                _unlink(self._file.name)
+            self._file = None
+
+    def close(self):
+        # Dipanggil server WSGI setelah response selesai atau terputus
+        self._discard()
+        if hasattr(self._chunks, 'close'):
+            self._chunks.close()
+
+    def _discard(self):
+        if self._file:
+            self._file.close()
+            _unlink(self._file.name)
+            self._file = None
+
+def _unlink(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
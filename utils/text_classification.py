@@ -3,19 +3,32 @@ import re
 import logging
 import numpy as np
 import pickle
-import nltk
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
 
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import tensorflow as tf
+from utils.classifier_pool import ClassifierPoolClient, ClassifierPoolError
+from utils.env import env_flag
+from utils.inference_batcher import MicroBatcher
+from utils.lite_backend import LITE_MODEL_FILE, VOCABULARY_FILE, LiteModel, LiteVocabulary
+from utils.metrics import classifier_stage
+from utils.model_registry import BUNDLED_VERSION, get_registry
+from utils.vocabulary import CompiledVocabulary
 
-# Logging setup
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Panjang sequence yang diharapkan model
+MAX_SEQUENCE_LENGTH = 100
+
+# Direktori model bawaan
+BUNDLED_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# TensorFlow, NLTK dan Sastrawi diimpor di dalam method agar import modul ini
+# (dan seluruh app Flask) tetap ringan; model dimuat lewat get_classifier().
 
 # Ensure NLTK resources are downloaded
 def ensure_nltk_resources():
+    import nltk
+
     try:
         nltk.data.find('tokenizers/punkt')
     except LookupError:
@@ -31,25 +44,55 @@ def ensure_nltk_resources():
     except LookupError:
         nltk.download('punkt_tab')
 
-ensure_nltk_resources()
+def configure_tf_threading():
+    """
+    Apply CLASSIFIER_INTRA_OP_THREADS / CLASSIFIER_INTER_OP_THREADS to TensorFlow
+
+    Must run before the first TensorFlow op in the process; with several
+    gunicorn workers on one machine, small per-worker pools avoid
+    oversubscribing the CPUs.
+    """
+    import tensorflow as tf
+
+    intra_op = os.getenv('CLASSIFIER_INTRA_OP_THREADS')
+    inter_op = os.getenv('CLASSIFIER_INTER_OP_THREADS')
+    try:
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(int(intra_op))
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(int(inter_op))
+    except RuntimeError as e:
+        # TensorFlow sudah diinisialisasi di proses ini
+        logging.warning(f"Could not configure TensorFlow threading: {e}")
 
 class EmergencyCaseClassifier:
-    def __init__(self, base_path=None):
+    def __init__(self, base_path=None, load_model=True, model_dir=None, version=BUNDLED_VERSION, backend=None):
         """
         Initialize the classifier with optional base path for model files
         
         :param base_path: Base directory for model files. If None, uses the current directory
+        :param load_model: If False, skip building the model until load_model() is called
+        :param model_dir: Directory holding the model files directly; overrides base_path
+        :param version: Model version name recorded on the incidents it labels
+        :param backend: 'keras' or 'tflite'. If None, uses CLASSIFIER_BACKEND (default 'keras')
         """
-        logging.info("Initializing EmergencyCaseClassifier...")
+        self.backend = (backend or os.getenv('CLASSIFIER_BACKEND', 'keras')).strip().lower()
+        if self.backend not in ('keras', 'tflite'):
+            raise ValueError(f"Unknown classifier backend: {self.backend}")
+
+        logging.info(f"Initializing EmergencyCaseClassifier (version {version}, backend {self.backend})...")
+        self.version = version
 
-        # Determine base path
-        if base_path is None:
-            base_path = os.path.dirname(os.path.abspath(__file__))
+        # Determine model directory
+        if model_dir is None:
+            model_dir = BUNDLED_MODEL_DIR if base_path is None else os.path.join(base_path, 'models')
         
         # Construct full paths to model files
-        self.model_path = os.path.join(base_path, 'models/emergency_case_model.h5')
-        self.tokenizer_path = os.path.join(base_path, 'models/tokenizer.pickle')
-        self.label_encoder_path = os.path.join(base_path, 'models/label_encoder.pickle')
+        self.model_path = os.path.join(model_dir, 'emergency_case_model.h5')
+        self.tokenizer_path = os.path.join(model_dir, 'tokenizer.pickle')
+        self.label_encoder_path = os.path.join(model_dir, 'label_encoder.pickle')
+        self.lite_model_path = os.path.join(model_dir, LITE_MODEL_FILE)
+        self.vocabulary_path = os.path.join(model_dir, VOCABULARY_FILE)
         
         # Validate file existence
         self._validate_files()
@@ -58,15 +101,19 @@ class EmergencyCaseClassifier:
         self._init_preprocessing()
         
         # Load machine learning components
-        self._load_ml_components()
+        self._load_ml_components(load_model)
 
     def _validate_files(self):
         """Check if all required model files exist"""
-        files_to_check = [
-            self.model_path, 
-            self.tokenizer_path, 
-            self.label_encoder_path
-        ]
+        if self.backend == 'tflite':
+            # Dibuat dengan: flask classifier export-lite
+            files_to_check = [self.lite_model_path, self.vocabulary_path]
+        else:
+            files_to_check = [
+                self.model_path, 
+                self.tokenizer_path, 
+                self.label_encoder_path
+            ]
         
         for file_path in files_to_check:
             if not os.path.exists(file_path):
@@ -77,6 +124,13 @@ class EmergencyCaseClassifier:
         """Initialize text preprocessing components"""
         logging.info("Initializing text preprocessing components...")
 
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        from nltk.corpus import stopwords
+        from nltk.tokenize import word_tokenize
+
+        ensure_nltk_resources()
+        self._word_tokenize = word_tokenize
+
         # Stemmer
         factory = StemmerFactory()
         self.stemmer = factory.create_stemmer()
@@ -89,55 +143,183 @@ class EmergencyCaseClassifier:
         self.stop_words = self.stop_words - custom_stopwords
         
         # Maximum sequence length for padding
-        self.MAX_SEQUENCE_LENGTH = 100
+        self.MAX_SEQUENCE_LENGTH = MAX_SEQUENCE_LENGTH
+
+        # Cache stemming per kata dan cache hasil praproses per deskripsi (LRU).
+        # Stemmer bawaan Sastrawi memakai cache tanpa batas, jadi LRU ini
+        # membungkus stemmer intinya agar memori tetap terbatas.
+        base_stemmer = getattr(self.stemmer, 'delegatedStemmer', self.stemmer)
+        self._stem = lru_cache(maxsize=int(os.getenv('CLASSIFIER_STEM_CACHE_SIZE', 4096)))(base_stemmer.stem)
+        self._preprocess_cached = lru_cache(maxsize=int(os.getenv('CLASSIFIER_TEXT_CACHE_SIZE', 1024)))(self._preprocess_normalized)
         logging.info("Text preprocessing components initialized.")
 
-    def _load_ml_components(self):
+    def _load_ml_components(self, load_model=True):
         """Load machine learning model and encoders"""
         logging.info("Loading machine learning components...")
+        self.model = None
+
+        if self.backend == 'tflite':
+            # Backend lite tidak membutuhkan runtime TensorFlow penuh
+            self.tokenizer = LiteVocabulary(self.vocabulary_path)
+            self.label_encoder = self.tokenizer
+        else:
+            # Import TensorFlow here so a preloading master shares its code pages
+            import tensorflow as tf
+
+            try:
+                # Load tokenizer
+                with open(self.tokenizer_path, 'rb') as handle:
+                    self.tokenizer = pickle.load(handle)
+                
+                # Load label encoder
+                with open(self.label_encoder_path, 'rb') as handle:
+                    self.label_encoder = pickle.load(handle)
+
+            except Exception as e:
+                raise RuntimeError(f"Error loading machine learning components: {e}")
+
+        # Kosakata dikompilasi sekali agar encoding batch tidak melewati Tokenizer Keras
+        self.vocabulary = CompiledVocabulary.from_tokenizer(self.tokenizer)
+
+        if load_model:
+            self.load_model()
+        logging.info("Machine learning components loaded successfully.")
 
+    def load_model(self):
+        """Load the LSTM model and build its inference function"""
         try:
-            # Load LSTM model
-            self.model = tf.keras.models.load_model(self.model_path)
-            
-            # Load tokenizer
-            with open(self.tokenizer_path, 'rb') as handle:
-                self.tokenizer = pickle.load(handle)
-            
-            # Load label encoder
-            with open(self.label_encoder_path, 'rb') as handle:
-                self.label_encoder = pickle.load(handle)
-            logging.info("Machine learning components loaded successfully.")
+            if self.backend == 'tflite':
+                self.model = LiteModel(self.lite_model_path)
+                self._forward = self.model
+                self._forward(np.zeros((1, self.MAX_SEQUENCE_LENGTH), dtype=np.int32))
+            else:
+                import tensorflow as tf
+
+                configure_tf_threading()
+
+                # Load LSTM model
+                self.model = tf.keras.models.load_model(self.model_path)
+                self._build_inference_function()
+
+            self._build_keyword_classifier()
 
         except Exception as e:
             raise RuntimeError(f"Error loading machine learning components: {e}")
 
-    def preprocess_text(self, text):
+    def _build_inference_function(self):
+        """Trace the model once with a fixed input signature and warm it up"""
+        logging.info("Tracing inference function...")
+
+        import tensorflow as tf
+
+        self.length_buckets = self._length_buckets()
+
+        # Dengan bucket, panjang sequence ikut dinamis; graph tetap di-trace sekali
+        sequence_length = None if self.length_buckets else self.MAX_SEQUENCE_LENGTH
+
+        @tf.function(input_signature=[
+            tf.TensorSpec(shape=(None, sequence_length), dtype=tf.int32)
+        ])
+        def infer(sequences):
+            return self.model(sequences, training=False)
+
+        self._infer = infer
+        self._forward = lambda padded: infer(padded).numpy()
+
+        # Warm-up agar tracing tidak terjadi pada request pertama
+        for width in self.length_buckets or [self.MAX_SEQUENCE_LENGTH]:
+            self._infer(tf.zeros((1, width), dtype=tf.int32))
+        logging.info("Inference function ready.")
+
+    def _length_buckets(self):
         """
-        Preprocess input text
-        
-        :param text: Input text to preprocess
-        :return: Preprocessed tokens
+        Padding widths for length-bucketed inference, or None to always pad to MAX_SEQUENCE_LENGTH
+
+        Shorter padding only leaves the output unchanged when the model skips
+        padded steps, i.e. when its Embedding layer uses mask_zero=True.
+        Otherwise the LSTM also steps over the trailing zeros and bucketing
+        would change predictions, so it stays disabled.
+
+        :raises ValueError: If CLASSIFIER_LENGTH_BUCKETS has an entry that is
+                            not a positive integer
         """
-        logging.info("Preprocessing text...")
+        import tensorflow as tf
+
+        # Entri kosong (mis. koma di akhir) dilewati; selain bilangan bulat positif ditolak
+        entries = [entry.strip() for entry in os.getenv('CLASSIFIER_LENGTH_BUCKETS', '8,16,32,64').split(',')]
+        entries = [entry for entry in entries if entry]
+        if not entries:
+            return None
+        invalid = [entry for entry in entries if not entry.isdigit() or int(entry) == 0]
+        if invalid:
+            raise ValueError(f"CLASSIFIER_LENGTH_BUCKETS must be positive integers, got: {', '.join(invalid)}")
+
+        masks_padding = any(
+            isinstance(layer, tf.keras.layers.Embedding) and layer.mask_zero
+            for layer in self.model.layers
+        )
+        if not masks_padding:
+            logging.info("Model does not mask padding; length bucketing disabled.")
+            return None
 
+        widths = sorted({int(entry) for entry in entries if int(entry) < self.MAX_SEQUENCE_LENGTH})
+        return widths + [self.MAX_SEQUENCE_LENGTH]
+
+    def normalize_text(self, text):
+        """
+        Normalize input text into the key used by the preprocessing cache
+        
+        :param text: Input text to normalize
+        :return: Normalized text
+        """
         # Convert to lowercase
         text = text.lower()
         
         # Remove punctuation
         text = re.sub(r'[\^\w\s]', '', text)
+
+        # Collapse whitespace so equivalent descriptions share a cache entry
+        return ' '.join(text.split())
+
+    def preprocess_text(self, text):
+        """
+        Preprocess input text
         
+        :param text: Input text to preprocess
+        :return: Preprocessed tokens
+        """
+        return list(self._preprocess_cached(self.normalize_text(text)))
+
+    def _preprocess_normalized(self, text):
+        """Tokenize, filter stopwords and stem normalized text"""
         # Tokenize
-        tokens = word_tokenize(text)
+        with classifier_stage('tokenize'):
+            tokens = self._word_tokenize(text)
         
         # Remove stopwords
-        tokens = [word for word in tokens if word not in self.stop_words]
+        with classifier_stage('stopwords'):
+            tokens = [word for word in tokens if word not in self.stop_words]
         
         # Stem tokens
-        tokens = [self.stemmer.stem(word) for word in tokens]
+        with classifier_stage('stem'):
+            return tuple(self._stem(word) for word in tokens)
 
-        logging.info("Text preprocessing completed.")
-        return tokens
+    def cache_stats(self):
+        """
+        Return hit/miss counters of the preprocessing caches
+        
+        :return: Dict with stats for the stem cache and the description cache
+        """
+        stats = {}
+        for name, cached in (('stem', self._stem), ('text', self._preprocess_cached)):
+            info = cached.cache_info()
+            stats[name] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'size': info.currsize,
+                'maxsize': info.maxsize,
+            }
+        return stats
 
     def predict(self, text):
         """
@@ -149,45 +331,478 @@ class EmergencyCaseClassifier:
         if not text.strip():
             raise ValueError("Input text is empty.")
 
-        try:
-            logging.info("Predicting emergency case...")
-            
-            # Preprocess text
-            tokens = self.preprocess_text(text)
-            
-            # Convert to sequence
-            sequence = self.tokenizer.texts_to_sequences([tokens])
-            
-            # Pad sequence
-            padded = pad_sequences(sequence, padding='post', maxlen=self.MAX_SEQUENCE_LENGTH)
-            
+        return self.predict_batch([text])[0]
+
+    def _encode(self, texts):
+        """Preprocess texts into a padded index matrix and the length of each row"""
+        # Preprocess text
+        tokens = [self.preprocess_text(text) for text in texts]
+        
+        # Convert to sequences, then pad; padding is timed as 'pad' whether
+        # or not length bucketing trims it further before the forward pass
+        with classifier_stage('sequence'):
+            sequences = self.vocabulary.lookup(tokens)
+        with classifier_stage('pad'):
+            return self.vocabulary.pad(sequences, self.MAX_SEQUENCE_LENGTH)
+
+    def predict_scores(self, texts):
+        """
+        Run the model on several texts and return its raw softmax output
+        
+        :param texts: List of non-empty input texts
+        :return: NumPy array of shape (len(texts), number of classes)
+        """
+        return self._score_matrix(*self._encode(texts))
+
+    def _score_matrix(self, matrix, lengths):
+        """Run the model on a padded index matrix"""
+        buckets = getattr(self, 'length_buckets', None)
+        if not buckets:
             # Predict
-            prediction = self.model.predict(padded)
-            
-            # Get predicted index
-            predicted_index = np.argmax(prediction, axis=1)
+            with classifier_stage('forward'):
+                return self._forward(matrix)
+
+        # Kelompokkan per bucket panjang; padding di luar lebar bucket dipotong
+        widths = np.asarray(buckets)[np.searchsorted(buckets, lengths)]
+
+        scores = None
+        for width in np.unique(widths):
+            indices = np.flatnonzero(widths == width)
+            with classifier_stage('pad'):
+                padded = np.ascontiguousarray(matrix[indices, :width])
+            with classifier_stage('forward'):
+                prediction = self._forward(padded)
+            if scores is None:
+                scores = np.empty((len(matrix), prediction.shape[1]), dtype=prediction.dtype)
+            scores[indices] = prediction
+        return scores
+
+    def _build_keyword_classifier(self):
+        """
+        Score every frequent vocabulary word on its own with the model
+
+        A description whose words all point to the same class with at least
+        CLASSIFIER_KEYWORD_THRESHOLD probability is then labeled from this
+        table without running the LSTM. Disabled unless the threshold is set.
+        """
+        self._keyword_table = None
+        self._shortcut_stats = {'requests': 0, 'skipped': 0, 'model_seconds': 0.0, 'keyword_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+        threshold = os.getenv('CLASSIFIER_KEYWORD_THRESHOLD')
+        if not threshold:
+            return
+        self._keyword_threshold = float(threshold)
+
+        # Indeks Tokenizer diurutkan dari kata paling sering
+        vocab_size = max(self.tokenizer.word_index.values(), default=0)
+        vocab_size = min(vocab_size, int(os.getenv('CLASSIFIER_KEYWORD_VOCAB', 2000)))
+        if vocab_size < 1:
+            return
+
+        logging.info(f"Building keyword pre-classifier over {vocab_size} words...")
+        table = []
+        for start in range(1, vocab_size + 1, 512):
+            words = np.arange(start, min(start + 512, vocab_size + 1), dtype=np.int32)
+            matrix = np.zeros((len(words), self.MAX_SEQUENCE_LENGTH), dtype=np.int32)
+            matrix[:, 0] = words
+            table.append(self._score_matrix(matrix, np.ones(len(words), dtype=np.intp)))
+        table = np.concatenate(table)
+
+        # Baris 0 (padding) tidak pernah dipakai; isi agar indeks sama dengan word index
+        self._keyword_table = np.vstack([np.zeros((1, table.shape[1]), dtype=table.dtype), table])
+        self._keyword_class = self._keyword_table.argmax(axis=1)
+        self._keyword_confident = self._keyword_table.max(axis=1) >= self._keyword_threshold
+        self._keyword_confident[0] = False
+        logging.info(f"Keyword pre-classifier ready ({int(self._keyword_confident.sum())} confident words).")
+
+    def _keyword_scores(self, sequence):
+        """Scores from the keyword table, or None when the LSTM is needed"""
+        if self._keyword_table is None or not len(sequence):
+            return None
+        if sequence.max() >= len(self._keyword_table):
+            return None
+
+        if not self._keyword_confident[sequence].all():
+            return None
+        if (self._keyword_class[sequence] != self._keyword_class[sequence[0]]).any():
+            return None
+        return self._keyword_table[sequence].mean(axis=0)
+
+    def predict_proba(self, texts, temperature=None):
+        """
+        Predict calibrated per-class probabilities
+        
+        Scores are temperature-scaled with CLASSIFIER_TEMPERATURE (default 1.0,
+        i.e. the model's own softmax); fit it on labeled incidents with
+        ``flask classifier calibrate``. Texts the keyword pre-classifier is
+        confident about skip the LSTM.
+        
+        :param texts: List of non-empty input texts
+        :param temperature: Temperature to use instead of CLASSIFIER_TEMPERATURE
+        :return: NumPy array of shape (len(texts), number of classes)
+        """
+        matrix, lengths = self._encode(texts)
+
+        started = time.perf_counter()
+        shortcut = [self._keyword_scores(row[:length]) for row, length in zip(matrix, lengths)]
+        keyword_seconds = time.perf_counter() - started
+
+        remaining = [index for index, scores in enumerate(shortcut) if scores is None]
+        model_seconds = 0.0
+        if remaining:
+            started = time.perf_counter()
+            model_scores = self._score_matrix(matrix[remaining], lengths[remaining])
+            model_seconds = time.perf_counter() - started
+            for index, scores in zip(remaining, model_scores):
+                shortcut[index] = scores
+
+        with self._stats_lock:
+            self._shortcut_stats['requests'] += len(texts)
+            self._shortcut_stats['skipped'] += len(texts) - len(remaining)
+            self._shortcut_stats['keyword_seconds'] += keyword_seconds
+            self._shortcut_stats['model_seconds'] += model_seconds
+
+        return self._calibrate(np.vstack(shortcut), temperature)
+
+    def _calibrate(self, scores, temperature=None):
+        if temperature is None:
+            temperature = float(os.getenv('CLASSIFIER_TEMPERATURE', 1.0))
+        if temperature == 1.0:
+            return scores
+        # softmax(logit / T) dihitung dari probabilitas: p^(1/T) lalu dinormalisasi
+        logits = np.log(np.clip(scores, 1e-12, None)) / temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        calibrated = np.exp(logits)
+        return calibrated / calibrated.sum(axis=1, keepdims=True)
+
+    def shortcut_stats(self):
+        """
+        Skip rate of the keyword pre-classifier and the model time it saved
+        
+        :return: Dict with request counts, skip rate and timing estimates (ms)
+        """
+        with self._stats_lock:
+            stats = dict(self._shortcut_stats)
+
+        model_requests = stats['requests'] - stats['skipped']
+        model_ms = stats['model_seconds'] * 1000 / model_requests if model_requests else 0.0
+        keyword_ms = stats['keyword_seconds'] * 1000 / stats['requests'] if stats['requests'] else 0.0
+        return {
+            'requests': stats['requests'],
+            'skipped': stats['skipped'],
+            'skip_rate': stats['skipped'] / stats['requests'] if stats['requests'] else 0.0,
+            'model_ms_per_text': model_ms,
+            'keyword_ms_per_text': keyword_ms,
+            'estimated_saved_ms': stats['skipped'] * model_ms,
+        }
+
+    def predict_top_k(self, texts, k=3):
+        """
+        Predict the k most likely labels for each text
+        
+        :param texts: List of input texts to classify
+        :param k: Number of labels to return per text
+        :return: List (per text) of lists of (label, probability), most likely first
+        """
+        if any(not text.strip() for text in texts):
+            raise ValueError("Input text is empty.")
+
+        try:
+            probabilities = self.predict_proba(texts)
             
-            # Return label
-            label = self.label_encoder.inverse_transform(predicted_index)[0]
-            logging.info(f"Prediction completed. Predicted label: {label}")
-            return label
+            with classifier_stage('decode'):
+                # Get predicted indices, most likely first
+                top_index = np.argsort(-probabilities, axis=1)[:, :k]
+                top_labels = self.label_encoder.inverse_transform(top_index.ravel()).reshape(top_index.shape)
+                
+                # Return labels
+                results = [
+                    [(str(label), float(probabilities[row, index])) for label, index in zip(top_labels[row], top_index[row])]
+                    for row in range(len(texts))
+                ]
+            return results
 
         except Exception as e:
             logging.error(f"Error during prediction: {e}")
             raise RuntimeError(f"Prediction error: {e}")
 
-# Create a singleton instance
-try:
-    emergency_classifier = EmergencyCaseClassifier()
-except Exception as e:
-    logging.error(f"Failed to initialize EmergencyCaseClassifier: {e}")
-    raise
+    def predict_batch(self, texts):
+        """
+        Predict emergency case labels for several texts in one forward pass
+        
+        :param texts: List of input texts to classify
+        :return: List of predicted labels, in the same order as texts
+        """
+        return [result[0][0] for result in self.predict_top_k(texts, k=1)]
+
+# Singleton classifier, dimuat secara lazy atau di background thread
+_classifier = None
+_preloaded = None
+_classifier_error = None
+_classifier_ready = threading.Event()
+_loader_thread = None
+_loader_lock = threading.Lock()
+
+def _build_classifier(load_model=True):
+    """Build a classifier for the active registry version, or the bundled model"""
+    registry = get_registry()
+    version = registry.active_version() if registry is not None else None
+    if version is None:
+        return EmergencyCaseClassifier(load_model=load_model)
+    return EmergencyCaseClassifier(load_model=load_model, model_dir=registry.path_for(version), version=version)
+
+def _load_classifier():
+    global _classifier, _classifier_error
+    try:
+        if _preloaded is not None:
+            # Mode preload: tokenizer, encoder dan stemmer sudah ada dari master
+            _preloaded.load_model()
+            _classifier = _preloaded
+        else:
+            _classifier = _build_classifier()
+    except Exception as e:
+        logging.error(f"Failed to initialize EmergencyCaseClassifier: {e}")
+        _classifier_error = e
+    finally:
+        _classifier_ready.set()
+
+    # Watcher tetap jalan meski load pertama gagal, agar versi yang
+    # diperbaiki (atau diaktifkan ulang) bisa dimuat tanpa restart
+    if get_registry() is not None:
+        _watch_active_version()
+
+def _watch_active_version():
+    """Reload the classifier whenever the registry's active version changes, or until one loads"""
+    global _classifier, _classifier_error
+    interval = float(os.getenv('CLASSIFIER_RELOAD_INTERVAL', 30))
+    registry = get_registry()
+    failed_version = None
+
+    while True:
+        time.sleep(interval)
+        version = registry.active_version() or BUNDLED_VERSION
+        # Tanpa classifier yang jalan, versi yang gagal dicoba ulang tiap interval
+        current = _classifier.version if _classifier is not None else None
+        if version == current or (current is not None and version == failed_version):
+            continue
+
+        logging.info(f"Loading classifier version {version} (current: {current})...")
+        try:
+            # Model baru dimuat dan di-warm-up sepenuhnya sebelum ditukar;
+            # request yang sedang berjalan tetap memakai instance lama
+            candidate = _build_classifier()
+        except Exception as e:
+            logging.error(f"Failed to load classifier version {version}, keeping {current}: {e}")
+            # Jangan coba ulang versi yang sama sampai ACTIVE diubah lagi
+            failed_version = version
+            continue
+
+        failed_version = None
+        _classifier = candidate
+        _classifier_error = None
+        logging.info(f"Classifier version {version} is now active.")
+
+def start_classifier_loading():
+    """
+    Start loading the classifier in a background thread (no-op if already started)
+    """
+    global _loader_thread
+    with _loader_lock:
+        if _loader_thread is None:
+            _loader_thread = threading.Thread(target=_load_classifier, name='classifier-loader', daemon=True)
+            _loader_thread.start()
+
+def preload_classifier():
+    """
+    Load everything except the Keras model in the current (master) process
+
+    Tokenizer, label encoder, stopwords, the Sastrawi dictionary and the
+    TensorFlow modules are loaded once and then frozen out of the garbage
+    collector, so forked gunicorn workers share those pages copy-on-write.
+    The model itself is built per worker after fork (see post_fork in
+    gunicorn.conf.py): TensorFlow runtime state does not survive fork().
+    """
+    global _preloaded
+    import gc
+
+    if _preloaded is None:
+        _preloaded = _build_classifier(load_model=False)
+
+        # Pindahkan objek yang ada ke generasi permanen agar GC di worker
+        # tidak menyentuh (dan menyalin) halaman memori milik master
+        gc.collect()
+        gc.freeze()
+    return _preloaded
+
+def init_classifier():
+    """
+    Load the classifier according to CLASSIFIER_LOAD_MODE
+
+    - ``background`` (default): start loading in a background thread
+    - ``lazy``: load on the first prediction
+    - ``eager``: load synchronously before returning
+    - ``preload``: load the shareable parts now and the model after fork
+
+    Nothing is loaded when CLASSIFIER_POOL_SOCKET is set: the pool
+    processes hold the model and request workers stay small. The pool
+    client is created instead, failing early without CLASSIFIER_POOL_AUTHKEY.
+    """
+    mode = os.getenv('CLASSIFIER_LOAD_MODE', 'background').strip().lower()
+    if mode not in ('eager', 'background', 'preload', 'lazy'):
+        raise ValueError(f"Unknown CLASSIFIER_LOAD_MODE: {mode}")
+    if pool_enabled():
+        get_pool_client()
+        return
+
+    if mode == 'eager':
+        get_classifier()
+    elif mode == 'background':
+        start_classifier_loading()
+    elif mode == 'preload':
+        preload_classifier()
+
+def is_classifier_ready():
+    """
+    :return: True once the classifier has been loaded successfully
+    """
+    return _classifier_ready.is_set() and _classifier is not None
+
+def classifier_status():
+    """
+    :return: One of 'not_started', 'loading', 'ready' or 'failed'; with a
+             classifier pool, the pool's status or 'unavailable'
+    """
+    pool = get_pool_client()
+    if pool is not None:
+        return pool.status()
+
+    if _classifier_ready.is_set():
+        return 'ready' if _classifier is not None else 'failed'
+    return 'loading' if _loader_thread is not None else 'not_started'
+
+def get_classifier(timeout=None):
+    """
+    Return the loaded classifier, starting and waiting for the load if needed
+    
+    :param timeout: Maximum number of seconds to wait, or None to wait forever
+    :return: EmergencyCaseClassifier instance
+    """
+    start_classifier_loading()
+    if not _classifier_ready.wait(timeout):
+        raise TimeoutError("EmergencyCaseClassifier is still loading.")
+    if _classifier is None:
+        raise RuntimeError(f"EmergencyCaseClassifier failed to load: {_classifier_error}")
+    return _classifier
+
+# Hasil klasifikasi beserta confidence dan versi model yang menghasilkannya;
+# fallback True jika label bukan dari model (pool penuh atau tidak terjangkau)
+Classification = namedtuple('Classification', ['label', 'confidence', 'model_version', 'fallback'], defaults=(False,))
+
+def classify_texts(texts):
+    """
+    Classify several texts with the active classifier
+    
+    :param texts: List of input texts to classify
+    :return: List of Classification, in the same order as texts
+    """
+    # Ambil instance sekali agar label dan versi berasal dari model yang sama
+    classifier = get_classifier()
+    return [
+        Classification(label, confidence, classifier.version)
+        for [(label, confidence)] in classifier.predict_top_k(texts, k=1)
+    ]
+
+# Micro-batching di depan classifier (aktif jika CLASSIFIER_BATCHING=true)
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_batcher():
+    """
+    Return the shared MicroBatcher for the classifier, or None when batching is disabled
+    """
+    global _batcher
+    if not env_flag('CLASSIFIER_BATCHING'):
+        return None
+
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    classify_texts,
+                    max_batch_size=int(os.getenv('CLASSIFIER_MAX_BATCH_SIZE', 16)),
+                    max_wait_ms=float(os.getenv('CLASSIFIER_MAX_WAIT_MS', 5)),
+                )
+    return _batcher
+
+# Pool proses classifier terpisah (aktif jika CLASSIFIER_POOL_SOCKET diisi)
+_pool_client = None
+
+def pool_enabled():
+    """
+    :return: True when classifications are sent to a classifier pool
+    """
+    return bool(os.getenv('CLASSIFIER_POOL_SOCKET'))
+
+def get_pool_client():
+    """
+    Return the ClassifierPoolClient, or None when no pool socket is configured
+    """
+    global _pool_client
+    socket_path = os.getenv('CLASSIFIER_POOL_SOCKET')
+    if not socket_path:
+        return None
+
+    if _pool_client is None:
+        _pool_client = ClassifierPoolClient(
+            socket_path,
+            timeout=float(os.getenv('CLASSIFIER_POOL_TIMEOUT', 2.0)),
+        )
+    return _pool_client
+
+def get_fallback_label(client_label=None):
+    """
+    Label used when classification is skipped, deferred or unavailable
+    
+    :param client_label: Label supplied by the client, if any
+    :return: client_label, or CLASSIFIER_FALLBACK_LABEL (default 'medium')
+    """
+    return client_label or os.getenv('CLASSIFIER_FALLBACK_LABEL', 'medium')
+
+def classify_emergency_case(text, fallback_label=None):
+    """
+    Predict emergency case label with its confidence and the model version that produced it
+    
+    :param text: Input text to classify
+    :param fallback_label: Label to use when the classifier pool is saturated or unreachable.
+        Defaults to CLASSIFIER_FALLBACK_LABEL
+    :return: Classification; for fallback labels fallback is True and
+        confidence and model_version are None
+    """
+    pool = get_pool_client()
+    if pool is not None:
+        try:
+            return Classification(*pool.classify(text))
+        except ClassifierPoolError as e:
+            label = get_fallback_label(fallback_label)
+            logging.warning(f"{e} Falling back to label: {label}")
+            return Classification(label, None, None, fallback=True)
+
+    batcher = get_batcher()
+    if batcher is not None:
+        return batcher.predict(text)
+
+    if not text.strip():
+        raise ValueError("Input text is empty.")
+    return classify_texts([text])[0]
 
-def predict_emergency_case(text):
+def predict_emergency_case(text, fallback_label=None):
     """
     Convenience function to predict emergency case label
     
     :param text: Input text to classify
+    :param fallback_label: Label to use when the classifier pool is saturated or unreachable.
+        Defaults to CLASSIFIER_FALLBACK_LABEL
     :return: Predicted label
     """
-    return emergency_classifier.predict(text)
+    return classify_emergency_case(text, fallback_label).label
@@ -0,0 +1,147 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import concurrent.futures
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.models import Incident, PictureStatus
+from utils.env import env_flag
+from utils.storage import get_storage
+from utils.uploads import upload_image
+
+# Upload gambar di thread pool terbatas agar latensi laporan tidak menunggu GCS.
+# Default: upload berjalan bersamaan dengan klasifikasi dan ditunggu sebelum insert.
+# STORAGE_ASYNC_UPLOADS=true: incident disimpan dengan picture_status pending dan
+# path gambar diisi setelah upload selesai (setelah response dikirim).
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+def async_upload_enabled():
+    return env_flag('STORAGE_ASYNC_UPLOADS')
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = int(os.getenv('STORAGE_UPLOAD_WORKERS', 4))
+                _slots = threading.BoundedSemaphore(int(os.getenv('STORAGE_UPLOAD_MAX_PENDING', 64)))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload-job')
+    return _executor
+
+def _detach(image):
+    # File multipart ditutup saat request selesai; salin ke file sementara milik job
+    if isinstance(image, str):
+        return image
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(image.stream, spool)
+    spool.seek(0)
+    return spool
+
+def _upload(image, dir):
+    try:
+        return upload_image(image, dir)
+    finally:
+        if not isinstance(image, str):
+            image.close()
+
+def submit_upload(image, dir, detach=False):
+    """
+    Start uploading an image in the background
+
+    When the queue is full the image is uploaded synchronously instead.
+
+    :param image: Image returned by request_image()
+    :param dir: Target directory in the bucket
+    :param detach: Copy multipart files so the upload may outlive the request
+    :return: Future resolving to the stored path, or None if the upload failed
+    """
+    executor = _get_executor()
+    task = upload_image
+    if detach:
+        image = _detach(image)
+        task = _upload
+
+    if not _slots.acquire(blocking=False):
+        logging.warning("Upload queue is full, uploading inline.")
+        future = Future()
+        try:
+            future.set_result(task(image, dir))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    future = executor.submit(task, image, dir)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def discard_upload(upload, wait=False):
+    """
+    Release whatever an upload stores for a request that failed before saving it
+
+    :param upload: Future returned by submit_upload()
+    :param wait: Block until the upload ends; needed when it still reads the
+                 request stream (submitted without detach)
+    """
+    if upload.cancel():
+        return
+    if wait:
+        concurrent.futures.wait([upload])
+
+    def release(future):
+        path = None if future.exception() else future.result()
+        if path:
+            enqueue_deletion(path)
+    upload.add_done_callback(release)
+
+def enqueue_deletion(path):
+    """
+    Release a stored file in the background instead of during the request
+
+    Call it only after the change that drops the reference is committed.
+    When the queue is full the file is left in place; `flask storage gc`
+    removes it once no row references it.
+
+    :param path: Path returned by upload_image()
+    """
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logging.warning(f"Upload queue is full, leaving {path} to the orphan collector.")
+        return
+
+    future = executor.submit(get_storage().deleteFile, path)
+    future.add_done_callback(lambda _: _slots.release())
+
+def store_incident_picture(incident_id, upload):
+    """
+    Fill in the picture of a pending incident once its upload finishes
+
+    :param incident_id: ID of the committed incident
+    :param upload: Future returned by submit_upload(..., detach=True)
+    """
+    app = current_app._get_current_object()
+    upload.add_done_callback(lambda future: _store_picture(app, incident_id, future))
+
+def _store_picture(app, incident_id, upload):
+    with app.app_context():
+        try:
+            file_path = upload.result()
+        except Exception as e:
+            logging.error(f"Background upload of the picture of incident {incident_id} failed: {e}")
+            file_path = None
+
+        try:
+            Incident.query.filter_by(id=incident_id).update({
+                'picture': file_path,
+                'picture_status': PictureStatus.UPLOADED if file_path else PictureStatus.FAILED,
+            })
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to store picture of incident {incident_id}: {e}")
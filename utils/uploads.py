@@ -0,0 +1,55 @@
+import binascii
+import io
+
+from flask import request
+
+from utils.base64_stream import Base64Stream
+from utils.images import SNIFF_SIZE, InvalidImageError, inspect_image
+from utils.storage import get_storage
+
+def request_data():
+    """
+    Request fields from a JSON body or, for uploads, from multipart/form-data
+
+    :return: Dict of submitted fields (without file parts)
+    """
+    if request.mimetype == 'multipart/form-data':
+        return request.form.to_dict()
+    return request.get_json()
+
+def request_image(data, field):
+    """
+    Image sent in field, either as a multipart file part or as base64 in JSON
+
+    :param data: Fields returned by request_data()
+    :param field: Field name, e.g. 'picture' or 'avatar'
+    :return: werkzeug FileStorage, base64 string, or None if no image was sent
+    """
+    return request.files.get(field) or data.get(field)
+
+def check_image(image):
+    """
+    Reject an image returned by request_image() before it is uploaded in the
+    background, reading only its header
+
+    :raises InvalidImageError: If the image is not one of ALLOWED_IMAGE_TYPES
+    """
+    if isinstance(image, str):
+        try:
+            inspect_image(io.BufferedReader(Base64Stream(image, SNIFF_SIZE)))
+        except binascii.Error as e:
+            raise InvalidImageError(f"Invalid base64 data: {e}")
+    else:
+        inspect_image(getattr(image, 'stream', image))
+
+def upload_image(image, dir):
+    """
+    Upload an image returned by request_image()
+
+    :return: Path of the stored file, or None if the upload failed
+    :raises InvalidImageError: If the image is not one of ALLOWED_IMAGE_TYPES
+    """
+    if isinstance(image, str):
+        return get_storage().uploadFile(image, dir=dir)
+    # FileStorage dari request, atau file biasa yang sudah dilepas dari request
+    return get_storage().uploadBinary(getattr(image, 'stream', image), dir=dir)
@@ -1,10 +1,11 @@
-from PIL import Image
 import base64
 import io
 import re
 from flask import jsonify
 
 from app.extensions import db
+from utils.base64_stream import Base64Stream
+from utils.images import inspect_image
 from datetime import datetime 
 
 class Validator :
@@ -96,13 +97,10 @@ def allowed_file(filename, exts = []) :
     
 def isBase64Image(base64_image):
     try:
-        # Decode Base64 string
-        image_data = base64.b64decode(base64_image)
-        # Cek apakah data tersebut adalah gambar yang valid menggunakan Pillow
-        image = Image.open(io.BytesIO(image_data))
-        image.verify()  # Memastikan tidak ada kerusakan data
+        # Hanya header yang di-decode untuk mengenali tipe dan dimensi gambar
+        inspect_image(io.BufferedReader(Base64Stream(base64_image, 64 * 1024)))
         return True
-    except (base64.binascii.Error, IOError):
+    except (ValueError, IOError):
         return False
 
 def is_valid_email(email):
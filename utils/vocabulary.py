@@ -0,0 +1,108 @@
+import numpy as np
+
+class _Lookup(dict):
+    """Word -> index dict that resolves unknown words like the Keras Tokenizer"""
+
+    def __init__(self, word_index, oov_index, lower):
+        super().__init__(word_index)
+        # -1 menandai kata yang dibuang (tanpa oov_token)
+        self.oov_index = -1 if oov_index is None else oov_index
+        self.lower = lower
+
+    def __missing__(self, token):
+        if self.lower:
+            lowered = token.lower()
+            if lowered != token:
+                return self[lowered]
+        return self.oov_index
+
+class CompiledVocabulary:
+    def __init__(self, word_index, oov_index=None, num_words=None, lower=True):
+        """
+        Tokenizer vocabulary compiled for batch encoding
+
+        Gives the same indices as Keras Tokenizer.texts_to_sequences on lists
+        of tokens followed by pad_sequences(padding='post', truncating='pre').
+
+        :param word_index: Word -> index mapping of the tokenizer
+        :param oov_index: Index for unknown words, or None to drop them
+        :param num_words: Words with index >= num_words count as unknown
+        :param lower: Lowercase tokens before looking them up
+        """
+        if num_words:
+            word_index = {
+                word: (index if index < num_words else oov_index)
+                for word, index in word_index.items()
+                if index < num_words or oov_index is not None
+            }
+        self._lookup = _Lookup(word_index, oov_index, lower)
+        self._drops_unknown = oov_index is None
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer):
+        """
+        :param tokenizer: Keras Tokenizer or LiteVocabulary
+        :return: CompiledVocabulary with the tokenizer's lookup rules
+        """
+        if hasattr(tokenizer, 'oov_index'):
+            # LiteVocabulary: num_words sudah diterapkan saat ekspor
+            return cls(tokenizer.word_index, tokenizer.oov_index, lower=tokenizer.lower)
+
+        oov_index = tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token else None
+        return cls(tokenizer.word_index, oov_index, tokenizer.num_words, tokenizer.lower)
+
+    def encode(self, token_lists, maxlen):
+        """
+        Map a batch of token lists into one padded index matrix
+
+        :param token_lists: List of token lists
+        :param maxlen: Padded length; longer sequences keep their last maxlen indices
+        :return: Tuple of an int32 array of shape (len(token_lists), maxlen)
+                 and the unpadded length of each row
+        """
+        return self.pad(self.lookup(token_lists), maxlen)
+
+    def lookup(self, token_lists):
+        """
+        Map a batch of token lists to indices, without padding
+
+        :param token_lists: List of token lists
+        :return: Tuple of the flat indices, the row of each index and the
+                 length of each row, to pass to pad()
+        """
+        count = len(token_lists)
+        lookup = self._lookup
+
+        lengths = np.fromiter(map(len, token_lists), dtype=np.intp, count=count)
+        flat = np.fromiter(
+            (lookup[token] for tokens in token_lists for token in tokens),
+            dtype=np.int32, count=int(lengths.sum()),
+        )
+        rows = np.repeat(np.arange(count), lengths)
+
+        if self._drops_unknown:
+            known = flat >= 0
+            flat, rows = flat[known], rows[known]
+            lengths = np.bincount(rows, minlength=count)
+        return flat, rows, lengths
+
+    def pad(self, sequences, maxlen):
+        """
+        Place sequences returned by lookup() into one padded index matrix
+
+        :param sequences: Tuple returned by lookup()
+        :param maxlen: Padded length; longer sequences keep their last maxlen indices
+        :return: Tuple of an int32 array of shape (rows, maxlen) and the
+                 unpadded length of each row
+        """
+        flat, rows, lengths = sequences
+        count = len(lengths)
+
+        # Posisi tiap indeks di barisnya, digeser agar hanya maxlen terakhir tersisa
+        starts = np.cumsum(lengths) - lengths
+        columns = np.arange(len(flat)) - starts[rows] - np.maximum(lengths - maxlen, 0)[rows]
+        kept = columns >= 0
+
+        matrix = np.zeros((count, maxlen), dtype=np.int32)
+        matrix[rows[kept], columns[kept]] = flat[kept]
+        return matrix, np.minimum(lengths, maxlen)